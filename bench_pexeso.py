@@ -0,0 +1,241 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+# -----------------------
+# Benchmarky bez okna a zvuku
+# -----------------------
+# Spúšťa hru s dummy ovládačmi SDL a meria vykresľovanie, update aj vstup.
+#   python bench_pexeso.py                     # všetky benchmarky
+#   python bench_pexeso.py -k cards            # len tie, ktorých názov obsahuje "cards"
+#   python bench_pexeso.py --save base.json    # uloží výsledky ako základ
+#   python bench_pexeso.py --compare base.json # zlyhá (kód 1), ak je niečo pomalšie
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import pexeso
+from pexeso_engine import difficulties, make_settings
+
+SEED = 1234
+benchmarks = {}  # názov -> príprava, ktorá vráti meranú operáciu
+
+def bench(name):
+    def register(fn):
+        benchmarks[name] = fn
+        return fn
+    return register
+
+def measure(op, min_time, repeats):
+    # najprv zahriatie, potom repeats behov po aspoň min_time sekúnd; berie sa medián
+    op()
+    rates = []
+    for _ in range(repeats):
+        n = 0
+        t0 = time.perf_counter()
+        while True:
+            op()
+            n += 1
+            dt = time.perf_counter() - t0
+            if dt >= min_time:
+                break
+        rates.append(n / dt)
+    ops = statistics.median(rates)
+    return {"ops_per_sec": ops, "ms_per_op": 1000 / ops}
+
+# -----------------------
+# Pomocné
+# -----------------------
+def scramble(board, rng):
+    # karty v rôznych fázach otáčania, časť spárovaná
+    n = len(board)
+    for i in range(n):
+        board.flip[i] = rng.randint(0, pexeso.ATLAS_STEPS) / pexeso.ATLAS_STEPS
+        board.revealed[i] = board.flip[i] < 0.5
+        board.matched[i] = rng.random() < 0.1
+
+def game_in_state(state, difficulty="hard"):
+    game = pexeso.Game()
+    game.game_mode, game.difficulty = "multi", difficulty
+    if state == "game":
+        game.start_game()
+        scramble(game.engine.board, random.Random(SEED))
+    game.state = state
+    return game
+
+boards = dict(
+    {name: (d["rows"], d["cols"], d) for name, d in difficulties.items()},
+    **{f"{r}x{c}": (r, c, make_settings(r, c)) for r, c in ((20, 20), (40, 40))},
+)
+
+# -----------------------
+# Pozadie
+# -----------------------
+@bench("background.gradient")
+def _():
+    return pexeso.draw_gradient
+
+@bench("background.fill")
+def _():
+    return lambda: pexeso.screen.fill(pexeso.GRAY)
+
+@bench("background.gradient_build")
+def _():
+    return lambda: pexeso.render_gradient(pexeso.width, pexeso.height)
+
+# -----------------------
+# Karty (otáčanie + blit z atlasu)
+# -----------------------
+def _cards(rows, cols, settings):
+    def setup():
+        engine = pexeso.Engine(settings, clock=pygame.time.get_ticks, rng=random.Random(SEED))
+        grid = pexeso.card_grid(rows, cols)
+        scramble(engine.board, random.Random(SEED))
+        scheme = pexeso.color_schemes[None]
+
+        def op():
+            engine.board.step_flip()
+            pexeso.draw_cards(engine.board, grid, scheme)
+        return op
+    return setup
+
+for _name, (_r, _c, _settings) in boards.items():
+    bench(f"cards.{_name}")(_cards(_r, _c, _settings))
+
+# -----------------------
+# Tlačidlo s pulzovaním
+# -----------------------
+@bench("button.pulse")
+def _():
+    t = [0]
+
+    def op():
+        t[0] += 1
+        pulse = 1 + 0.05 * pexeso.math.sin(t[0] * 0.1)
+        pexeso.draw_button("Štart", pexeso.YELLOW, center=(pexeso.width//2, pexeso.height//2), pulse=pulse)
+    return op
+
+# -----------------------
+# Vstup
+# -----------------------
+def click_stream(grid, n, rng):
+    # klikanie po kartách aj do medzier medzi nimi
+    right = grid.gx + grid.cols*(grid.size+grid.margin)
+    bottom = grid.gy + grid.rows*(grid.size+grid.margin)
+    return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1,
+                               pos=(rng.randrange(grid.gx, right), rng.randrange(grid.gy, bottom)))
+            for _ in range(n)]
+
+def _clicks(difficulty):
+    def setup():
+        game = game_in_state("game", difficulty)
+        events = click_stream(game.grid, 4096, random.Random(SEED))
+        state = {"i": 0}
+
+        def op():
+            # jeden klik; čas snímky beží, aby sa nesprávne páry skrývali
+            if game.engine.game_over:
+                game.start_game()
+            game.now += 600
+            game.handle_event(events[state["i"] % len(events)])
+            game.update()
+            state["i"] += 1
+        return op
+    return setup
+
+for _name in difficulties:
+    bench(f"input.click.{_name}")(_clicks(_name))
+
+@bench("input.card_at.40x40")
+def _():
+    grid = pexeso.card_grid(40, 40)
+    pts = [e.pos for e in click_stream(grid, 4096, random.Random(SEED))]
+    state = {"i": 0}
+
+    def op():
+        grid.card_at(pts[state["i"] % len(pts)])
+        state["i"] += 1
+    return op
+
+@bench("input.menu_hit")
+def _():
+    index = pexeso.menu_layout("settings")[1]
+    rng = random.Random(SEED)
+    pts = [(rng.randrange(pexeso.width), rng.randrange(pexeso.height)) for _ in range(4096)]
+    state = {"i": 0}
+
+    def op():
+        index.hit(pts[state["i"] % len(pts)])
+        state["i"] += 1
+    return op
+
+# -----------------------
+# Celé snímky
+# -----------------------
+def _frame(state):
+    def setup():
+        game = game_in_state(state)
+        return lambda: game.frame([])
+    return setup
+
+for _state in ("main", "submenu", "settings", "game"):
+    bench(f"frame.{_state}")(_frame(_state))
+
+# -----------------------
+# Spustenie
+# -----------------------
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = r["ops_per_sec"] / base["ops_per_sec"]
+        r["vs_baseline"] = ratio
+        if ratio < 1 - tolerance:
+            regressions.append((name, ratio))
+    return regressions
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmarky Pexesa (bez okna a zvuku).")
+    ap.add_argument("-k", "--filter", default="", help="spusti len benchmarky obsahujúce tento text")
+    ap.add_argument("--min-time", type=float, default=0.3, help="sekúnd na jedno meranie")
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--save", metavar="SÚBOR", help="ulož výsledky ako JSON")
+    ap.add_argument("--compare", metavar="SÚBOR", help="porovnaj so základom a pri spomalení skonči kódom 1")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="povolené spomalenie voči základu (0.15 = 15 %%)")
+    args = ap.parse_args(argv)
+
+    pexeso.startup()
+    results = {}
+    for name, setup in benchmarks.items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(setup(), args.min_time, args.repeats)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+
+    print(f"{'benchmark':<28s}{'ops/s':>12s}{'ms/op':>10s}{'vs základ':>11s}")
+    for name, r in results.items():
+        vs = f"{r['vs_baseline']:.2f}x" if "vs_baseline" in r else ""
+        print(f"{name:<28s}{r['ops_per_sec']:12.1f}{r['ms_per_op']:10.3f}{vs:>11s}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+    if regressions:
+        for name, ratio in regressions:
+            print(f"SPOMALENIE: {name} {ratio:.2f}x základu", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
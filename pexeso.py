@@ -1,14 +1,113 @@
 import asyncio
+import csv
+import json
+import os
 import platform
-import pygame
 import random
+import sqlite3
+import struct
+import threading
+import time
+import pygame
 import math
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+import numpy as np
 
+from pexeso_engine import Engine, VirtualClock, difficulties, make_settings
+from pexeso_store import DB_PATH, Store, game_result
+
+# -----------------------
+# Štart
 # -----------------------
-# Inicializácia Pygame + Mixer
+# Import nič neinicializuje. startup() otvorí okno a načíta len fonty pre
+# hlavné menu; hudba a efekty sa načítajú na pozadí (v prehliadači
+# po prvej snímke) a ostatné fonty až pri prvom použití. Cesty k fontom sa
+# medzi behmi ukladajú do cache, lebo hľadanie systémových fontov je pomalé.
+# PEXESO_STARTUP_TIMINGS=1 vypíše trvanie jednotlivých fáz.
+T0 = time.perf_counter()
+EMSCRIPTEN = platform.system() == "Emscripten"
+STARTUP_TIMINGS = os.environ.get("PEXESO_STARTUP_TIMINGS") == "1"
+startup_times = OrderedDict()  # fáza -> ms
+
+@contextmanager
+def startup_phase(name):
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_times[name] = (time.perf_counter() - t) * 1000
+
+def startup_report():
+    lines = [f"  {name:<14s}{ms:8.1f} ms" for name, ms in startup_times.items()]
+    return "štart:\n" + "\n".join(lines)
+
 # -----------------------
-pygame.init()
-pygame.mixer.init()
+# Nastavenie okna
+# -----------------------
+# Súradnice UI sú v návrhovom rozlíšení BASE_W x BASE_H a prepočítavajú sa
+# mierkou okna (px, ux, uy); okno sa dá zväčšovať a všetko sa kreslí priamo
+# v natívnom rozlíšení. PEXESO_WINDOW_SIZE=1920x1080 nastaví počiatočnú veľkosť.
+BASE_W, BASE_H = 1200, 800
+MIN_W, MIN_H = 480, 320
+width, height = (tuple(int(v) for v in os.environ["PEXESO_WINDOW_SIZE"].split("x"))
+                 if os.environ.get("PEXESO_WINDOW_SIZE") else (BASE_W, BASE_H))
+ui_scale = 1.0
+ui_top = 0  # zvislý okraj, keď má okno iný pomer strán
+screen = None
+
+def px(v):
+    # dĺžka z návrhového rozlíšenia v pixeloch okna
+    return max(1, round(v * ui_scale))
+
+def ux(dx):
+    # vodorovne: posun od stredu okna
+    return width//2 + round(dx * ui_scale)
+
+def uy(y):
+    # zvisle: návrhová súradnica, obsah je vycentrovaný
+    return ui_top + round(y * ui_scale)
+
+def set_view(size):
+    # mierka a rozloženie pre plochu danej veľkosti (okno alebo povrch relácie)
+    global width, height, ui_scale, ui_top, settings_circle_center, settings_circle_radius
+    width, height = size
+    ui_scale = min(width/BASE_W, height/BASE_H)
+    ui_top = (height - round(BASE_H*ui_scale)) // 2
+    settings_circle_center = (px(100), uy(100))
+    settings_circle_radius = px(30)
+
+def resize(size):
+    # prepočíta mierku a zahodí všetko, čo závisí od veľkosti okna; nové
+    # fonty, písmená, pozadie a rozloženie sa vyrenderujú raz pri ďalšej snímke
+    global screen
+    set_view((max(MIN_W, size[0]), max(MIN_H, size[1])))
+    fonts.clear()
+    card_surfs.clear()
+    layout_cache.clear()
+    drop_backgrounds((width, height))
+    if screen is not None:
+        screen = pygame.display.get_surface()
+        if screen.get_size() != (width, height):
+            screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
+    renderer.invalidate()
+
+def startup():
+    global screen
+    if screen is not None:
+        return
+    startup_times["modul"] = (time.perf_counter() - T0) * 1000
+    with startup_phase("pygame"):
+        pygame.mixer.pre_init(AUDIO_FREQ, -16, 2, AUDIO_BUFFER)
+        pygame.init()
+    with startup_phase("okno"):
+        screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
+        pygame.display.set_caption("Pexeso")
+        resize((width, height))
+    with startup_phase("fonty menu"):
+        for name in ("title", "subtitle", "button"):
+            get_font(name)
+    start_audio()
 
 # -----------------------
 # Načítanie zvukov
@@ -20,23 +119,113 @@ pygame.mixer.init()
 #   ├─ game_over.wav
 #   ├─ button_click.wav      ← nový efekt pre klik na tlačidlo
 #   └─ match.wav             ← nový efekt pre správny pár
-pygame.mixer.music.load("sounds/background.mp3")
-pygame.mixer.music.set_volume(0.5)
-pygame.mixer.music.play(-1)
+#
+# Mixer beží s malým bufferom (PEXESO_AUDIO_BUFFER vzoriek, menej = nižšia
+# latencia, viac = odolnosť na preťaženom stroji); hudba sa z disku streamuje
+# cez ten istý buffer. Efekty sa pri načítaní dekódujú a prevzorkujú do
+# formátu mixera, každá skupina efektov má vlastné rezervované kanály a
+# hlasitosť sa nastavuje najviac raz za snímku (apply_volume).
+AUDIO_FREQ   = 44100
+AUDIO_BUFFER = int(os.environ.get("PEXESO_AUDIO_BUFFER", "512"))
+SOUND_FILES = {
+    "flip":      "sounds/flip.wav",
+    "game_over": "sounds/game_over.wav",
+    "button":    "sounds/button_click.wav",
+    "match":     "sounds/match.wav",
+}
+# game_over má vlastný kanál, lebo hrá súčasne so zvukom posledného páru
+SOUND_GROUPS   = {"flip": "card", "match": "result", "game_over": "end", "button": "ui"}
+CHANNEL_GROUPS = {"card": 2, "result": 1, "end": 1, "ui": 1}  # skupina -> počet kanálov
+sounds = {}                      # naplní load_audio()
+channels = {}                    # skupina -> [Channel], posledný použitý je na konci
+volume_dirty = False
+audio_ready = threading.Event()
+audio_pending = False
 
-flip_sound       = pygame.mixer.Sound("sounds/flip.wav")
-game_over_sound = pygame.mixer.Sound("sounds/game_over.wav")
-button_sound     = pygame.mixer.Sound("sounds/button_click.wav")
-match_sound      = pygame.mixer.Sound("sounds/match.wav")
-for s in (flip_sound, game_over_sound, button_sound, match_sound):
-    s.set_volume(0.5)
+def reserve_channels():
+    n = sum(CHANNEL_GROUPS.values())
+    pygame.mixer.set_num_channels(max(8, n))
+    pygame.mixer.set_reserved(n)
+    i = 0
+    for group, count in CHANNEL_GROUPS.items():
+        channels[group] = [pygame.mixer.Channel(i + k) for k in range(count)]
+        i += count
 
-# -----------------------
-# Nastavenie okna
-# -----------------------
-width, height = 1200, 800
-screen = pygame.display.set_mode((width, height))
-pygame.display.set_caption("Pexeso")
+def load_audio():
+    try:
+        if not pygame.mixer.get_init():
+            with startup_phase("mixer"):
+                pygame.mixer.init(AUDIO_FREQ, -16, 2, AUDIO_BUFFER)
+        reserve_channels()
+        with startup_phase("hudba"):
+            pygame.mixer.music.load("sounds/background.mp3")
+            pygame.mixer.music.set_volume(settings_data["volume"])
+            pygame.mixer.music.play(-1)
+            if not settings_data["sound"]:
+                pygame.mixer.music.pause()
+        with startup_phase("efekty"):
+            for name, path in SOUND_FILES.items():
+                snd = pygame.mixer.Sound(path)
+                snd.set_volume(settings_data["volume"])
+                sounds[name] = snd
+    except pygame.error:
+        pass  # bez zvukového zariadenia hra beží potichu
+    audio_ready.set()
+
+def start_audio():
+    global audio_pending
+    if EMSCRIPTEN:
+        audio_pending = True  # v prehliadači nie sú vlákna, načíta sa po prvej snímke
+    else:
+        threading.Thread(target=load_audio, name="pexeso-audio", daemon=True).start()
+
+def poll_audio():
+    global audio_pending
+    if audio_pending:
+        audio_pending = False
+        load_audio()
+
+def play_sound(name):
+    snd = sounds.get(name)
+    if snd is None or not settings_data["sound"]:
+        return
+    group = channels[SOUND_GROUPS[name]]
+    # voľný kanál skupiny, inak sa preruší najdlhšie hrajúci
+    ch = next((c for c in group if not c.get_busy()), group[0])
+    group.remove(ch)
+    group.append(ch)
+    ch.play(snd)
+
+def set_volume(volume):
+    global volume_dirty
+    settings_data["volume"] = volume
+    volume_dirty = True
+
+def apply_volume():
+    # raz za snímku, nech ťahanie slidera nevolá mixer pri každom pohybe myši
+    global volume_dirty
+    if not volume_dirty or not audio_ready.is_set():
+        return
+    volume_dirty = False
+    volume = settings_data["volume"]
+    for snd in sounds.values():
+        snd.set_volume(volume)
+    if pygame.mixer.get_init():
+        pygame.mixer.music.set_volume(volume)
+
+def set_sound(on):
+    settings_data["sound"] = on
+    if pygame.mixer.get_init():
+        if on:
+            pygame.mixer.music.unpause()
+        else:
+            pygame.mixer.music.pause()
+
+def play_events(events):
+    # zvuky k udalostiam z pexeso_engine
+    for ev in events:
+        if ev in SOUND_FILES:
+            play_sound(ev)
 
 # -----------------------
 # Farby
@@ -61,6 +250,24 @@ settings_data = {
     "volume": 0.5,             # 0.0–1.0
 }
 
+def load_settings(saved):
+    # z JSON (databáza, záznam) prídu farby ako zoznamy
+    color = saved.get("background_color")
+    settings_data.update(saved, background_color=tuple(color) if color else None)
+
+# Nastavenia a výsledky hier sa ukladajú do SQLite (pexeso_store, PEXESO_DB);
+# zápis beží vo vlákne na pozadí, v prehliadači sa zapisuje raz za snímku.
+# Keď sa databáza nedá otvoriť (len na čítanie, zamknutá, poškodená), hra
+# beží bez ukladania.
+def open_store():
+    try:
+        store = Store(DB_PATH, threaded=not EMSCRIPTEN)
+        load_settings(store.load_settings())
+    except (sqlite3.Error, OSError, ValueError) as e:
+        print(f"nastavenia a štatistiky sa neukladajú: {e}")
+        return None
+    return store
+
 # -----------------------
 # Kontrastné schémy pre každé pozadie
 # -----------------------
@@ -81,389 +288,1324 @@ bg_options = [
     ("Ružová",     PASTEL_PINK),
 ]
 
+# -----------------------
+# Hracie plochy
+# -----------------------
+# PEXESO_BOARD=RxC (napr. 20x30) pridá do výberu obtiažnosti turnajovú plochu.
+boards = dict(difficulties)
+board_names  = ["easy", "medium", "hard"]
+board_labels = ["Ľahká", "Stredná", "Ťažká"]
+
+def add_board(spec):
+    rows, cols = (int(v) for v in spec.lower().split("x"))
+    boards[spec] = make_settings(rows, cols)
+    board_names.append(spec)
+    board_labels.append(spec)
+
+if os.environ.get("PEXESO_BOARD"):
+    add_board(os.environ["PEXESO_BOARD"])
+
 # -----------------------
 # Fonty
 # -----------------------
-try:
-    title_font    = pygame.font.SysFont("arial,helvetica,sans", 90, bold=True)
-    subtitle_font = pygame.font.SysFont("arial,helvetica,sans", 60, bold=True)
-    button_font   = pygame.font.SysFont("arial,helvetica,sans", 36, bold=True)
-    info_font     = pygame.font.SysFont("arial,helvetica,sans", 30)
-except:
-    title_font    = pygame.font.SysFont(None, 90)
-    subtitle_font = pygame.font.SysFont(None, 60)
-    button_font   = pygame.font.SysFont(None, 36)
-    info_font     = pygame.font.SysFont(None, 30)
+FONT_FAMILY = "arial,helvetica,sans"
+FONT_SPECS = {  # názov -> (veľkosť, tučné)
+    "title":    (90, True),
+    "subtitle": (60, True),
+    "button":   (36, True),
+    "info":     (30, False),
+    "debug":    (18, False),
+}
+FONT_CACHE_FILE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "pexeso", "fonts.json")
+fonts = {}  # (názov, veľkosť) -> Font pre aktuálnu mierku
+font_paths = None  # "rodina|tučné" -> [cesta, umelé tučné]
+
+def resolve_font(family, bold):
+    # rovnaké hľadanie ako SysFont, výsledok sa pamätá na disku
+    global font_paths
+    if font_paths is None:
+        try:
+            with open(FONT_CACHE_FILE, encoding="utf-8") as f:
+                font_paths = json.load(f)
+        except (OSError, ValueError):
+            font_paths = {}
+    key = f"{family}|{bold}"
+    hit = font_paths.get(key)
+    if hit is not None and (hit[0] is None or os.path.exists(hit[0])):
+        return hit
+    hit = pygame.font.SysFont(family, 1, bold=bold, constructor=lambda path, size, b, i: [path, b])
+    font_paths[key] = hit
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE_FILE), exist_ok=True)
+        with open(FONT_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(font_paths, f)
+    except OSError:
+        pass
+    return hit
+
+def load_font(family, size, bold):
+    try:
+        path, fake_bold = resolve_font(family, bold)
+        font = pygame.font.Font(path, size)
+        font.set_bold(fake_bold)
+    except Exception:
+        font = pygame.font.SysFont(None, size)
+    return font
+
+def get_font(name, size=None):
+    # size v pixeloch okna; bez neho sa veľkosť z FONT_SPECS preškáluje
+    base, bold = FONT_SPECS[name]
+    size = size or max(8, px(base))
+    font = fonts.get((name, size))
+    if font is None:
+        with startup_phase(f"font {name}"):
+            font = fonts[name, size] = load_font(FONT_FAMILY, size, bold)
+    return font
+
+# -----------------------
+# Cache vyrenderovaných textov
+# -----------------------
+# Kľúčom je (font, text, farba, antialias); font.render sa volá len pre
+# reťazce, ktoré sa naozaj zmenili (napr. časovač raz za sekundu).
+TEXT_CACHE_MAX = 256
+
+class TextCache:
+    def __init__(self, maxsize=TEXT_CACHE_MAX):
+        self.maxsize = maxsize
+        self.surfs = OrderedDict()
+        self.hits = self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surf = self.surfs.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.surfs.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        self.surfs[key] = surf
+        if len(self.surfs) > self.maxsize:
+            self.surfs.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self.surfs.clear()
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"texty: {len(self.surfs)}/{self.maxsize}, zásahy {self.hits}, výpadky {self.misses} ({rate:.1f} %)"
+
+text_cache = TextCache()
+render_text = text_cache.render
 
 # -----------------------
 # Gradient pozadia
 # -----------------------
+# Každá varianta pozadia sa vyrenderuje raz pre danú veľkosť okna a farbu
+# a uloží sa do malej LRU cache; v slučke sa už len blituje. Pri zmene
+# veľkosti okna resize() zahodí varianty ostatných veľkostí (celé okno
+# v 4K má ~33 MB); farby pozadia tej istej veľkosti ostávajú. Počas ťahania
+# okna sa posledné hotové pozadie len preškáluje a nové sa vyrenderuje, až
+# keď sa veľkosť RESIZE_SETTLE_MS nezmenila.
+BG_CACHE_MAX     = 8
+RESIZE_SETTLE_MS = 200
+bg_cache = OrderedDict()  # ((w, h), farba pozadia) -> skonvertovaný Surface
+bg_stretch = {}           # farba -> posledné hotové pozadie (zdroj pri ťahaní okna)
+bg_settle_at = 0          # do tohto času (ms) sa pozadie len preškáluje
+
+def render_gradient(w, h, inner=PASTEL_PINK, outer=PASTEL_PURPLE):
+    # Radiálny gradient cez NumPy. Kvantuje sa rovnako ako pôvodné sústredné
+    # kruhy s krokom 5 px, takže farieb je len rmax/5: spočíta sa tabuľka
+    # farieb a každému pixelu len index pásu (float32/int32, 2D pole).
+    rmax = max(w, h)
+    top = (rmax - 1) // 5
+    a = ((rmax - 5*np.arange(top + 1)) / rmax)[:, None]
+    colors = (np.asarray(outer, float)*a + np.asarray(inner, float)*(1 - a)).astype(np.uint8)
+    surf = pygame.Surface((w, h))
+    lut = np.array([surf.map_rgb(c) for c in colors.tolist()], dtype=np.uint32)
+    dx = np.arange(w, dtype=np.float32) - w//2
+    dy = np.arange(h, dtype=np.float32) - h//2
+    d = dx[:, None]**2 + dy[None, :]**2
+    np.sqrt(d, out=d)
+    np.subtract(rmax, d, out=d)
+    d *= np.float32(0.2)
+    band = d.astype(np.int32)
+    np.minimum(band, top, out=band)
+    pygame.surfarray.blit_array(surf, lut[band])
+    return surf.convert()
+
+def get_background(size, color):
+    key = (tuple(size), color)
+    surf = bg_cache.get(key)
+    if surf is not None:
+        bg_cache.move_to_end(key)
+        return surf
+    src = bg_stretch.get(color)
+    if src is not None and pygame.time.get_ticks() < bg_settle_at:
+        return pygame.transform.scale(src, size)
+    if len(bg_cache) >= BG_CACHE_MAX:
+        bg_cache.popitem(last=False)
+    if color is None:
+        surf = render_gradient(*size)
+    else:
+        surf = pygame.Surface(size).convert()
+        surf.fill(color)
+    bg_cache[key] = surf
+    if bg_stretch.pop(color, None) is not None:
+        renderer.invalidate()  # nahradí preškálované pozadie na celej ploche
+    return surf
+
+def drop_backgrounds(keep_size):
+    global bg_settle_at
+    for key in [k for k in bg_cache if k[0] != tuple(keep_size)]:
+        bg_stretch[key[1]] = bg_cache.pop(key)
+    bg_settle_at = pygame.time.get_ticks() + RESIZE_SETTLE_MS
+
+def background_deadline():
+    # kedy treba snímku, ktorá vyrenderuje pozadie po ťahaní okna (alebo None)
+    if bg_stretch and pygame.time.get_ticks() < bg_settle_at:
+        return bg_settle_at
+    return None
+
 def draw_gradient():
-    bg = pygame.Surface((width, height), pygame.SRCALPHA)
-    for r in range(max(width, height), 0, -5):
-        a = r / max(width, height)
-        col = (
-            int(PASTEL_PURPLE[0]*a + PASTEL_PINK[0]*(1-a)),
-            int(PASTEL_PURPLE[1]*a + PASTEL_PINK[1]*(1-a)),
-            int(PASTEL_PURPLE[2]*a + PASTEL_PINK[2]*(1-a))
-        )
-        pygame.draw.circle(bg, col, (width//2, height//2), r)
-    screen.blit(bg, (0, 0))
-
-# -----------------------
-# Výber obtiažnosti
-# -----------------------
-difficulties = {
-    "easy":   {"rows": 4, "cols": 2, "values": list("AABBCCDD")},
-    "medium": {"rows": 4, "cols": 4, "values": list("AABBCCDDEEFFGGHH")},
-    "hard":   {"rows": 6, "cols": 4, "values": list("AABBCCDDEEFFGGHHIIJJKKLL")},
-}
-def init_game(settings):
-    rows, cols = settings["rows"], settings["cols"]
-    vals = settings["values"].copy()
-    random.shuffle(vals)
-    cards = [{
-        "value": vals[i],
-        "revealed": False,
-        "matched": False,
-        "flip_progress": 0.0
-    } for i in range(rows * cols)]
-    size, margin = 120, 15
-    grid_w = cols * (size + margin) - margin
-    grid_h = rows * (size + margin) - margin
-    gx = (width - grid_w) // 2
-    gy = (height - grid_h) // 2
-    return cards, rows, cols, size, margin, gx, gy
+    screen.blit(get_background((width, height), None), (0, 0))
+
+def draw_background():
+    screen.blit(get_background((width, height), settings_data["background_color"]), (0, 0))
+
+# -----------------------
+# Mriežka kariet
+# -----------------------
+# Poloha karty sa z bodu počíta aritmeticky, bez prechádzania všetkých kariet;
+# kliknutie do medzery medzi kartami nevyberie nič.
+class CardGrid:
+    def __init__(self, rows, cols, size, margin, gx, gy):
+        self.rows, self.cols = rows, cols
+        self.size, self.margin = size, margin
+        self.gx, self.gy = gx, gy
+
+    def cell(self, idx):
+        i, j = divmod(idx, self.cols)
+        return self.gx + j*(self.size+self.margin), self.gy + i*(self.size+self.margin)
+
+    def extent(self):
+        pitch = self.size + self.margin
+        return self.cols*pitch - self.margin, self.rows*pitch - self.margin
+
+    def clamp(self, w, h):
+        # menšia plocha ako okno je v strede, väčšia sa posúva najviac po okraj
+        gw, gh = self.extent()
+        self.gx = (w - gw)//2 if gw <= w else max(w - gw, min(0, self.gx))
+        self.gy = (h - gh)//2 if gh <= h else max(h - gh, min(0, self.gy))
+
+    def visible(self, w, h):
+        # (riadky, stĺpce) kariet, ktoré aspoň čiastočne zasahujú do okna
+        pitch = self.size + self.margin
+        rows = range(max(0, -self.gy//pitch), min(self.rows, (h - self.gy)//pitch + 1))
+        cols = range(max(0, -self.gx//pitch), min(self.cols, (w - self.gx)//pitch + 1))
+        return rows, cols
+
+    def card_at(self, pos):
+        x, y = pos[0] - self.gx, pos[1] - self.gy
+        if x < 0 or y < 0:
+            return None
+        j, ox = divmod(x, self.size + self.margin)
+        i, oy = divmod(y, self.size + self.margin)
+        if i >= self.rows or j >= self.cols or ox > self.size or oy > self.size:
+            return None
+        return int(i*self.cols + j)
+
+# Karta má 120 návrhových px a medzeru 15. Väčšia plocha sa zmenší, aby sa
+# zmestila do okna, no nie pod MIN_CARD; zvyšok sa posúva kolieskom myši
+# (so Shift vodorovne) a Ctrl + koliesko mení priblíženie (zoom). Priblížiť
+# sa dá najviac na návrhovú veľkosť karty, takže plocha, ktorá sa zmestí,
+# sa len odďaľuje; každá nová veľkosť karty je nový atlas.
+MIN_CARD = 48
+ZOOM_STEP = 1.1
+ZOOM_RANGE = (0.25, 4.0)
+
+def fit_pitch(rows, cols):
+    fit = min((width + px(15)) // cols, (height + px(15)) // rows)
+    return max(min(px(135), fit), px(MIN_CARD))
+
+def zoom_limits(rows, cols):
+    return ZOOM_RANGE[0], max(1.0, min(ZOOM_RANGE[1], px(135) / fit_pitch(rows, cols)))
+
+def card_grid(rows, cols, zoom=1.0):
+    pitch = min(px(135), max(4, int(fit_pitch(rows, cols) * zoom)))
+    margin = max(1, pitch // 9)
+    size = pitch - margin
+    grid = CardGrid(rows, cols, size, margin, 0, 0)
+    grid.clamp(width, height)
+    return grid
+
+def init_game(settings, mode, clock=pygame.time.get_ticks, rng=random):
+    engine = Engine(settings, mode=mode, clock=clock, rng=rng)
+    grid = card_grid(engine.rows, engine.cols)
+    if screen is not None:  # bez okna (prehrávanie bez kreslenia) sa nekreslí
+        get_atlas(grid.size, color_schemes[settings_data["background_color"]], engine.board.labels)
+    return engine, grid
+
+def winner_text(engine):
+    w = engine.winner()
+    if w is None:
+        return f"Získané páry: {engine.scores[0]}"
+    return "Remíza" if w == 0 else f"Víťaz: Hráč {w}"
 
 # -----------------------
 # Pred-render písmená
 # -----------------------
-card_surfs = {chr(i): info_font.render(chr(i), True, WHITE) for i in range(65, 91)}
+# Písmená sa renderujú až pri prvom použití do ohraničenej LRU cache, takže
+# pamäť rastie s tým, čo je vidieť, nie s počtom párov na ploche.
+GLYPH_CACHE_MAX = 1024
+card_surfs = OrderedDict()  # (hodnota, veľkosť karty) -> Surface
+
+def card_glyph(value, size):
+    key = (value, size)
+    surf = card_surfs.get(key)
+    if surf is not None:
+        card_surfs.move_to_end(key)
+        return surf
+    font = get_font("info", max(8, size//4))
+    surf = card_surfs[key] = font.render(value, True, WHITE)
+    if len(card_surfs) > GLYPH_CACHE_MAX:
+        card_surfs.popitem(last=False)
+    return surf
+
+# -----------------------
+# Atlas kariet (pred-renderované snímky otáčania)
+# -----------------------
+# flip_progress sa mení po 0.15 smerom od 1 aj od 0, takže všetky dosiahnuteľné
+# hodnoty ležia na mriežke 1/20. Pre každý krok sa raz vyrenderuje rub,
+# líce pre každú hodnotu a spárovaná karta; slučka už len blituje.
+ATLAS_STEPS = 20
+ATLAS_MAX_BYTES = 16 * 1024 * 1024
+ATLAS_PREWARM = 26  # pri väčšom počte hodnôt sa líca renderujú až pri odkrytí
+
+class CardAtlas:
+    def __init__(self, max_bytes=ATLAS_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.frames = OrderedDict()  # (hodnota, krok, spárovaná) -> Surface
+        self.nbytes = 0
+        self.key = None              # (veľkosť, rub, líce)
+
+    def build(self, size, scheme, values):
+        key = (size, scheme["card_back"], scheme["card_front"])
+        if key != self.key:
+            self.frames.clear()
+            self.nbytes = 0
+            self.key = key
+        for q in range(ATLAS_STEPS + 1):
+            self.frame(None, q / ATLAS_STEPS, True)
+            if q > ATLAS_STEPS // 2:
+                self.frame(None, q / ATLAS_STEPS, False)
+            elif len(values) <= ATLAS_PREWARM:
+                for v in values:
+                    self.frame(v, q / ATLAS_STEPS, False)
+
+    def frame(self, value, t, matched):
+        q = int(round(t * ATLAS_STEPS))
+        if matched or q > ATLAS_STEPS // 2:
+            value = None  # písmeno je vidieť len na odkrytej nespárovanej karte
+        k = (value, q, matched)
+        surf = self.frames.get(k)
+        if surf is not None:
+            self.frames.move_to_end(k)
+            return surf
+        surf = self._render(value, q / ATLAS_STEPS, matched)
+        self.frames[k] = surf
+        self.nbytes += surf.get_pitch() * surf.get_height()
+        while self.nbytes > self.max_bytes and len(self.frames) > 1:
+            _, old = self.frames.popitem(last=False)
+            self.nbytes -= old.get_pitch() * old.get_height()
+        return surf
+
+    def _render(self, value, t, matched):
+        size, bb, fb = self.key
+        scale = 1 - 0.3*abs(math.cos(math.pi*t))
+        surf = pygame.Surface((size, size), pygame.SRCALPHA)
+        col = (int(fb[0]*t+bb[0]*(1-t)), int(fb[1]*t+bb[1]*(1-t)), int(fb[2]*t+bb[2]*(1-t)))
+        pygame.draw.rect(surf, GRAY if matched else col, (0, 0, size, size), border_radius=max(1, size//12))
+        if value is not None:
+            txt = card_glyph(value, size)
+            surf.blit(txt, txt.get_rect(center=(size//2, size//2)))
+        scaled = pygame.transform.smoothscale(surf, (int(size*scale), int(size*scale)))
+        return scaled.convert_alpha()
+
+    def report(self):
+        return f"atlas kariet: {len(self.frames)} snímok, {self.nbytes/1024:.0f} / {self.max_bytes/1024:.0f} KiB"
+
+# Atlasy pre rôzne veľkosti kariet a farebné schémy (viac relácií, zoom)
+# sa držia v malej LRU cache.
+ATLAS_CACHE_MAX = 4
+card_atlases = OrderedDict()  # (veľkosť, rub, líce) -> CardAtlas
+
+def get_atlas(size, scheme, values=()):
+    key = (size, scheme["card_back"], scheme["card_front"])
+    atlas = card_atlases.get(key)
+    if atlas is not None:
+        card_atlases.move_to_end(key)
+        return atlas
+    atlas = card_atlases[key] = CardAtlas()
+    atlas.build(size, scheme, values)
+    if len(card_atlases) > ATLAS_CACHE_MAX:
+        card_atlases.popitem(last=False)
+    return atlas
+
+# -----------------------
+# Dirty-rect vykresľovanie (voliteľné)
+# -----------------------
+# Zapína sa premennou prostredia PEXESO_DIRTY_RECTS=1. Každý prvok UI nahlási
+# svoj obdĺžnik a podpis stavu; na obrazovku sa pošlú len obdĺžniky, ktorých
+# podpis sa od minulej snímky zmenil.
+DIRTY_RECTS = os.environ.get("PEXESO_DIRTY_RECTS") == "1"
+
+class DirtyRenderer:
+    def __init__(self, enabled=DIRTY_RECTS):
+        self.enabled = enabled
+        self.prev = {}    # kľúč -> (Rect, podpis) z minulej snímky
+        self.cur = {}
+        self.scene = None
+        self.full = True
+        self.pixels = 0   # počet pixelov odoslaných poslednou snímkou
+
+    def begin(self, scene):
+        # zmena scény (stav, pozadie, veľkosť okna) prekreslí celú obrazovku
+        if scene != self.scene:
+            self.scene = scene
+            self.full = True
+
+    def invalidate(self):
+        self.full = True
+
+    def mark(self, key, rect, sig=None):
+        self.cur[key] = (pygame.Rect(rect), sig)
+
+    def dirty_rects(self):
+        if self.full:
+            return [screen.get_rect()]
+        rects = []
+        for k, v in self.cur.items():
+            old = self.prev.get(k)
+            if old != v:
+                rects.append(v[0] if old is None else v[0].union(old[0]))
+        rects += [v[0] for k, v in self.prev.items() if k not in self.cur]
+        return rects
+
+    def collect(self):
+        # zmenené obdĺžniky; ďalšia snímka sa porovnáva s touto
+        rects = self.dirty_rects()
+        self.prev, self.cur = self.cur, {}
+        self.full = False
+        self.pixels = sum(r.w * r.h for r in rects)
+        return rects
+
+    def present(self):
+        if not self.enabled:
+            pygame.display.flip()
+            self.pixels = width * height
+            return
+        rects = self.collect()
+        if rects:
+            pygame.display.update(rects)
+
+class OffscreenRenderer(DirtyRenderer):
+    # relácia kreslí do vlastného povrchu; present() len zbiera zmenené
+    # obdĺžniky, ktoré si hostiteľ vyzdvihne cez take(). Bez skladania
+    # (composited=False, záťažové testy bez okna) sa nič nehromadí.
+    def __init__(self, composited=True):
+        super().__init__(enabled=True)
+        self.updated = [] if composited else None
+
+    def present(self):
+        rects = self.collect()
+        if self.updated is not None:
+            self.updated += rects
+
+    def take(self):
+        if self.updated is None:
+            return []
+        rects, self.updated = self.updated, []
+        return rects
+
+renderer = DirtyRenderer()
+
+# -----------------------
+# Filtrovanie vstupu
+# -----------------------
+# Do fronty sa pustia len udalosti, ktoré aktuálny stav číta (pohyb myši len
+# v nastaveniach kvôli slideru), takže ostatné ani nezobudia plánovač.
+# Súvislý rad pohybov myši sa v snímke zlúči do jedného.
+# pygame 2 posiela každý zárez kolieska aj ako MOUSEBUTTONDOWN s tlačidlom
+# 4 a vyššie; tie sa ako klik neberú, koliesko číta len MOUSEWHEEL.
+WHEEL_BUTTON = 4
+BASE_EVENTS  = (pygame.QUIT, pygame.VIDEORESIZE, pygame.WINDOWEXPOSED,
+                pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN)
+STATE_EVENTS = {"settings": BASE_EVENTS + (pygame.MOUSEMOTION,),
+                "game":     BASE_EVENTS + (pygame.MOUSEWHEEL,)}
+
+def allow_events(state):
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(STATE_EVENTS.get(state, BASE_EVENTS))
+
+def wheel_click(event):
+    return event.type == pygame.MOUSEBUTTONDOWN and event.button >= WHEEL_BUTTON
+
+def collapse_resize(events):
+    # pri ťahaní okna stačí posledná veľkosť v snímke
+    last = None
+    for i, ev in enumerate(events):
+        if ev.type == pygame.VIDEORESIZE:
+            last = i
+    return [ev for i, ev in enumerate(events) if ev.type != pygame.VIDEORESIZE or i == last]
+
+def collapse_motion(events):
+    out = []
+    for ev in events:
+        prev = out[-1] if out else None
+        if (ev.type == pygame.MOUSEMOTION and prev is not None and prev.type == pygame.MOUSEMOTION
+                and prev.buttons == ev.buttons):
+            rel = (prev.rel[0] + ev.rel[0], prev.rel[1] + ev.rel[1])
+            out[-1] = pygame.event.Event(pygame.MOUSEMOTION, pos=ev.pos, rel=rel,
+                                         buttons=ev.buttons, touch=getattr(ev, "touch", False))
+        else:
+            out.append(ev)
+    return out
+
+# -----------------------
+# Plánovač snímok
+# -----------------------
+# Plnú frekvenciu má slučka len počas otáčania kariet, pulzovanie tlačidiel
+# v menu beží na nižšej. Keď sa nič nehýbe, čaká sa na vstup (pygame.event.wait)
+# alebo na najbližší termín (skrytie nesprávneho páru, zmena časovača).
+# V prehliadači (Emscripten) sa nesmie blokovať, preto sa tam vždy len
+# odovzdá riadenie cez asyncio.sleep.
+ANIM_FPS   = 144
+PULSE_FPS  = 60
+IDLE_MS    = 250
+PULSE_RATE = 14.4  # rad/s, zodpovedá pôvodnému kroku 0.1 na snímku pri 144 FPS
+
+class FrameScheduler:
+    def __init__(self):
+        self.last = pygame.time.get_ticks()
+        self.pending = []  # udalosti zachytené počas čakania
+        self.state = None
+
+    def events(self, state=None):
+        if state != self.state:
+            self.state = state
+            allow_events(state)
+        evs, self.pending = self.pending + pygame.event.get(), []
+        return collapse_motion(collapse_resize(evs))
+
+    async def wait(self, fps=None, deadline=None):
+        # fps=None znamená nečinnosť: spí sa do vstupu, termínu alebo IDLE_MS
+        now = pygame.time.get_ticks()
+        delay = self.last + 1000/fps - now if fps else IDLE_MS
+        if deadline is not None:
+            delay = min(delay, deadline - now)
+        delay = max(0, delay)
+        if fps is None and not EMSCRIPTEN and delay >= 1:
+            ev = pygame.event.wait(int(delay))
+            if ev.type != pygame.NOEVENT:
+                self.pending.append(ev)
+            await asyncio.sleep(0)
+        else:
+            await asyncio.sleep(delay/1000)
+        self.last = pygame.time.get_ticks()
+
+# -----------------------
+# Profiler snímok
+# -----------------------
+# Meria čas práce v jednotlivých fázach snímky (bez spánku plánovača) a drží
+# kĺzavé okno vzoriek pre p50/p95/p99. F3 zapne prehľad na obrazovke;
+# PEXESO_PROFILE_OUT=cesta.csv|cesta.json uloží vzorky pri ukončení.
+PROFILE_WINDOW  = 600
+PROFILE_LOG_MAX = 100000
+PROFILE_KEY     = pygame.K_F3
+PROFILE_OUT     = os.environ.get("PEXESO_PROFILE_OUT")
+
+class FrameProfiler:
+    PHASES = ("events", "update", "background", "menu", "cards", "hud", "present")
+
+    def __init__(self, window=PROFILE_WINDOW, log=PROFILE_OUT is not None):
+        self.samples = {name: deque(maxlen=window) for name in ("frame",) + self.PHASES}
+        self.log = deque(maxlen=PROFILE_LOG_MAX) if log else None
+        self.overlay = False
+        self.overlay_surf = None
+        self.overlay_at = 0
+        self.cur = {}
+        self.t0 = self.t = time.perf_counter()
+
+    def begin_frame(self):
+        self.cur = dict.fromkeys(self.PHASES, 0.0)
+        self.t0 = self.t = time.perf_counter()
+
+    def lap(self, name):
+        # pripíše čas od poslednej značky fáze name
+        now = time.perf_counter()
+        self.cur[name] += now - self.t
+        self.t = now
+
+    def end_frame(self, state):
+        total = time.perf_counter() - self.t0
+        self.samples["frame"].append(total)
+        for name in self.PHASES:
+            self.samples[name].append(self.cur[name])
+        if self.log is not None:
+            self.log.append((state, total) + tuple(self.cur[n] for n in self.PHASES))
+
+    def percentiles(self, name, qs=(50, 95, 99)):
+        data = self.samples[name]
+        if not data:
+            return [0.0] * len(qs)
+        return [float(v) * 1000 for v in np.percentile(np.fromiter(data, float), qs)]
+
+    def summary(self):
+        return {name: dict(zip(("p50", "p95", "p99"), self.percentiles(name))) for name in self.samples}
+
+    def draw_overlay(self, surface, extra=()):
+        if not self.overlay:
+            return
+        now = pygame.time.get_ticks()
+        if self.overlay_surf is None or now - self.overlay_at >= 250:
+            self.overlay_at = now
+            font = get_font("debug")
+            p50, p95, p99 = self.percentiles("frame")
+            lines = [f"snímka p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f} ms"]
+            for name in self.PHASES:
+                a, b, _ = self.percentiles(name)
+                lines.append(f"{name:<11s}{a:7.2f}{b:7.2f}")
+            lines += list(extra)
+            surfs = [font.render(line, True, WHITE) for line in lines]
+            w = max(s.get_width() for s in surfs) + 16
+            h = sum(s.get_height() for s in surfs) + 16
+            self.overlay_surf = pygame.Surface((w, h), pygame.SRCALPHA)
+            self.overlay_surf.fill((0, 0, 0, 170))
+            y = 8
+            for s in surfs:
+                self.overlay_surf.blit(s, (8, y))
+                y += s.get_height()
+        rect = surface.blit(self.overlay_surf, (surface.get_width() - self.overlay_surf.get_width() - 10, 10))
+        renderer.mark("profiler", rect, self.overlay_at)
+
+    def dump(self, path):
+        rows = list(self.log or ())
+        cols = ("state", "frame_ms") + tuple(f"{n}_ms" for n in self.PHASES)
+        if path.endswith(".json"):
+            frames = [dict(zip(cols, (r[0],) + tuple(round(v*1000, 4) for v in r[1:]))) for r in rows]
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"summary": self.summary(), "frames": frames}, f, indent=1)
+        else:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(cols)
+                for r in rows:
+                    w.writerow((r[0],) + tuple(f"{v*1000:.4f}" for v in r[1:]))
 
 # -----------------------
 # Kreslenie tlačidla
 # -----------------------
 def draw_button(text, color, center=None, corner=None, inflate=(200,50), pulse=1.0):
-    surf = button_font.render(text, True, WHITE)
+    surf = render_text(get_font("button"), text, WHITE)
     rect = surf.get_rect(bottomright=corner) if corner else surf.get_rect(center=center)
     btn = rect.inflate(inflate[0]*pulse, inflate[1]*pulse)
-    pygame.draw.rect(screen, DARK_GRAY, (btn.left+5, btn.top+5, btn.width, btn.height), border_radius=15)
-    pygame.draw.rect(screen, color, btn, border_radius=15)
+    shadow = px(5)
+    pygame.draw.rect(screen, DARK_GRAY, btn.move(shadow, shadow), border_radius=px(15))
+    pygame.draw.rect(screen, color, btn, border_radius=px(15))
     screen.blit(surf, rect)
+    renderer.mark(("btn", text, center, corner), btn.union(btn.move(shadow, shadow)), color)
     return btn
 
+# -----------------------
+# Kreslenie kariet
+# -----------------------
+def draw_cards(board, grid, scheme):
+    size = grid.size
+    atlas = get_atlas(size, scheme)  # líca pripraví init_game; pri zoome až pri odkrytí
+    labels = board.labels; vals = board.values.tolist()
+    steps = np.rint(board.flip*ATLAS_STEPS).astype(np.int32).tolist()
+    matched = board.matched.tolist()
+    rows, cols = grid.visible(width, height)
+    for idx in (i*grid.cols + j for i in rows for j in cols):
+        x, y = grid.cell(idx)
+        spr = atlas.frame(labels[vals[idx]], steps[idx]/ATLAS_STEPS, matched[idx])
+        screen.blit(spr, (
+            x+(size-spr.get_width())//2,
+            y+(size-spr.get_height())//2))
+        renderer.mark(("card", idx), (x, y, size, size), (vals[idx], steps[idx], matched[idx]))
+
+# -----------------------
+# Rozloženie tlačidiel menu + hit-testing
+# -----------------------
+# Obdĺžniky tlačidiel sa počítajú z metrík fontu raz pre stav a veľkosť okna
+# (bez pulzovania) a ukladajú sa do priestorového indexu; klik sa testuje len
+# proti tlačidlám v príslušnej bunke mriežky.
+def button_rect(text, center=None, corner=None, inflate=(200,50), pulse=1.0):
+    rect = pygame.Rect((0, 0), get_font("button").size(text))
+    if corner:
+        rect.bottomright = corner
+    else:
+        rect.center = center
+    return rect.inflate(inflate[0]*pulse, inflate[1]*pulse)
+
+def menu_buttons(state, sound_on):
+    # [((druh, index), parametre pre draw_button)] v poradí vykresľovania
+    if state == "main":
+        return [(("start", 0), dict(text="Štart", center=(ux(0), uy(400)), inflate=(px(200),px(50))))]
+    if state == "submenu":
+        btns = [(("player", i), dict(text=txt, center=(ux(i*200-100), uy(350)), inflate=(px(150),px(50))))
+                for i, txt in enumerate(["1 Hráč", "2 Hráči"])]
+        btns += [(("diff", i), dict(text=txt, center=(ux(i*200-(len(board_labels)-1)*100), uy(530)),
+                                    inflate=(px(150),px(50))))
+                 for i, txt in enumerate(board_labels)]
+        btns.append((("play", 0), dict(text="HRAŤ", center=(ux(0), uy(700)), inflate=(px(150),px(50)))))
+        return btns
+    if state == "settings":
+        btns = [(("bg", i), dict(text=label, center=(ux(0), uy(220+i*80)), inflate=(px(300),px(60))))
+                for i, (label, _) in enumerate(bg_options)]
+        sound_text = "Zvuk: Zapnutý" if sound_on else "Zvuk: Vypnutý"
+        btns.append((("sound", 0), dict(text=sound_text, center=(ux(0), uy(220+len(bg_options)*80)), inflate=(px(300),px(60)))))
+        btns.append((("back", 0), dict(text="Späť", center=(ux(0), uy(700)), inflate=(px(200),px(50)))))
+        return btns
+    return [(("menu", 0), dict(text="MENU", corner=(width-px(20), height-px(20)), inflate=(px(20),px(20))))]
+
+class HitIndex:
+    CELL = 64
+
+    def __init__(self, items):
+        # items: [(id, Rect)] v poradí vykresľovania; neskoršie sú navrchu
+        self.buckets = {}
+        for order, (bid, r) in enumerate(items):
+            for cx in range(r.left//self.CELL, (r.right-1)//self.CELL + 1):
+                for cy in range(r.top//self.CELL, (r.bottom-1)//self.CELL + 1):
+                    self.buckets.setdefault((cx, cy), []).append((order, bid, r))
+
+    def hit(self, pos):
+        best = None
+        for item in self.buckets.get((pos[0]//self.CELL, pos[1]//self.CELL), ()):
+            if item[2].collidepoint(pos) and (best is None or item[0] > best[0]):
+                best = item
+        return best[1] if best else None
+
+layout_cache = {}
+
+def menu_layout(state):
+    key = (state, settings_data["sound"], width, height)
+    lay = layout_cache.get(key)
+    if lay is None:
+        buttons = menu_buttons(state, settings_data["sound"])
+        index = HitIndex([(bid, button_rect(**kw)) for bid, kw in buttons])
+        lay = layout_cache[key] = (dict(buttons), index)
+    return lay
+
 # -----------------------
 # Titulok + Nastavenia ikona
 # -----------------------
-title_surf   = title_font.render("Pexeso", True, WHITE)
-title_shadow = title_font.render("Pexeso", True, DARK_GRAY)
-title_rect   = title_surf.get_rect(center=(width//2, 100))
+def draw_title():
+    font = get_font("title")
+    surf = render_text(font, "Pexeso", WHITE)
+    rect = surf.get_rect(center=(ux(0), uy(100)))
+    screen.blit(render_text(font, "Pexeso", DARK_GRAY), (rect.x+px(5), rect.y+px(5)))
+    screen.blit(surf, rect)
 
-settings_circle_center = (100, 100)
+settings_circle_center = (100, 100)  # prepočíta resize()
 settings_circle_radius = 30
-settings_label    = subtitle_font.render("Nastavenia", True, WHITE)
-settings_label_sh = subtitle_font.render("Nastavenia", True, DARK_GRAY)
 
 # -----------------------
-# Hlavná slučka
+# Hra (stav UI + jedna snímka)
 # -----------------------
-async def main():
-    state = "main"  # main, submenu, game, settings
-    game_mode = difficulty = None
-
-    cards = []; rows = cols = 0
-    size = margin = 0; gx = gy = 0
-    first = second = None
-    waiting = False; wait_ms = 1000; wait_start = 0
-    p1_score = p2_score = p1_moves = p2_moves = 0
-    current = 1; matches = 0
-    game_over = False; winner = ""
-    game_started = False; start_time = 0
-
-    FPS = 144
-    clock = pygame.time.Clock()
-    pulse_time = 0
-
-    # Rect-y tlačidiel
-    start_btn = play_btn = None
-    player_btns = diff_btns = []
-    bg_option_btns = []; sound_btn = back_btn = None
-    menu_during_btn = None
-
-    while True:
-        mx, my = pygame.mouse.get_pos()
-        pulse_time += 0.1
-        pulse = 1 + 0.05 * math.sin(pulse_time)
-
-        # Slider pre hlasitosť
-        slider_x = width//2 - 150
-        slider_y = 220 + len(bg_options)*80 + 80
-        slider_w = 300; slider_h = 5; knob_r = 10
+class Game:
+    # Všetok čas hry je čas snímky (self.now), takže záznam vstupu s týmito
+    # časmi a rovnakým seedom prehrá hru presne rovnako.
+    def __init__(self, seed=None, clock=pygame.time.get_ticks):
+        self.state = "main"  # main, submenu, game, settings
+        self.game_mode = self.difficulty = None
+        self.engine = self.grid = None
+        self.zoom = 1.0
+        self.game_started = False
+        self.flipping = False
+        self.profiler = FrameProfiler()
+        self.seed = random.randrange(2**63) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.clock = clock
+        self.now = clock()
+        self.recorder = None
+        self.store = None  # pexeso_store.Store; pri prehrávaní a v reláciách nič neukladá
+        self.auto_tick = True  # pri prehrávaní sa časovače spúšťajú zo záznamu
+        self.event_handlers = {
+            pygame.QUIT:            self.on_quit,
+            pygame.VIDEORESIZE:     self.on_resize,
+            pygame.KEYDOWN:         self.on_key,
+            pygame.MOUSEMOTION:     self.on_motion,
+            pygame.MOUSEBUTTONDOWN: self.on_click,
+            pygame.MOUSEWHEEL:      self.on_wheel,
+            pygame.WINDOWEXPOSED:   self.on_expose,
+        }
+        self.click_handlers = {
+            ("main", "start"):     self.on_start,
+            ("submenu", "player"): self.on_player,
+            ("submenu", "diff"):   self.on_difficulty,
+            ("submenu", "play"):   self.on_play,
+            ("settings", "sound"): self.on_sound,
+            ("settings", "bg"):    self.on_background,
+            ("settings", "back"):  self.on_back,
+            ("game", "menu"):      self.on_menu,
+        }
+        self.miss_handlers = {"settings": self.on_slider, "game": self.on_board}
+
+    # Slider pre hlasitosť
+    def slider(self):
+        slider_x = ux(-150)
+        slider_y = uy(220 + len(bg_options)*80 + 80)
+        slider_w = px(300); slider_h = px(5); knob_r = px(10)
         slider_rect = pygame.Rect(slider_x, slider_y, slider_w, slider_h)
-        slider_area = slider_rect.inflate(knob_r*2, knob_r*2)
+        return slider_rect, slider_rect.inflate(knob_r*2, knob_r*2), knob_r
 
-        # vyber schémy
-        scheme = color_schemes[settings_data["background_color"]]
-        card_back_col  = scheme["card_back"]
-        card_front_col = scheme["card_front"]
-        btn_col        = scheme["button"]
+    def set_volume_at(self, x):
+        slider_rect = self.slider()[0]
+        set_volume(max(0, min(1, (x - slider_rect.x)/slider_rect.w)))
+        self.settings_changed()
 
-        # --- EVENT LOOP ---
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return
+    def settings_changed(self):
+        if self.store is not None:
+            self.store.save_settings(settings_data)
 
-            # ťahom myšou na slider
-            if state == "settings" and event.type == pygame.MOUSEMOTION and event.buttons[0]:
-                if slider_area.collidepoint(event.pos):
-                    rel = (event.pos[0] - slider_x)/slider_w
-                    settings_data["volume"] = max(0, min(1, rel))
-                    for s in (flip_sound, game_over_sound, button_sound, match_sound):
-                        s.set_volume(settings_data["volume"])
-                    pygame.mixer.music.set_volume(settings_data["volume"])
-
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                # Nastavenia ikona (len mimo hry)
-                if state != "game":
-                    dx = mx - settings_circle_center[0]
-                    dy = my - settings_circle_center[1]
-                    rect_txt = settings_label.get_rect(midleft=(
-                        settings_circle_center[0]+settings_circle_radius+10,
-                        settings_circle_center[1]
-                    ))
-                    if math.hypot(dx, dy) <= settings_circle_radius or rect_txt.collidepoint(mx, my):
-                        if settings_data["sound"]: button_sound.play()
-                        state = "settings"
-                        continue
-
-                # MENU počas hry
-                if state == "game" and menu_during_btn and menu_during_btn.collidepoint(mx, my):
-                    if settings_data["sound"]: button_sound.play()
-                    state = "main"
-                    game_mode = difficulty = None
-                    game_started = False
-                    continue
-
-                # Main → Submenu
-                if state == "main" and start_btn and start_btn.collidepoint(mx, my):
-                    if settings_data["sound"]: button_sound.play()
-                    state = "submenu"
-
-                # Submenu → Game
-                elif state == "submenu":
-                    for i, btn in enumerate(player_btns):
-                        if btn.collidepoint(mx, my):
-                            if settings_data["sound"]: button_sound.play()
-                            game_mode = ["single", "multi"][i]
-                    for i, btn in enumerate(diff_btns):
-                        if btn.collidepoint(mx, my):
-                            if settings_data["sound"]: button_sound.play()
-                            difficulty = ["easy", "medium", "hard"][i]
-                    if play_btn and play_btn.collidepoint(mx, my) and game_mode and difficulty:
-                        if settings_data["sound"]: button_sound.play()
-                        cards, rows, cols, size, margin, gx, gy = init_game(difficulties[difficulty])
-                        p1_score = p2_score = p1_moves = p2_moves = 0
-                        current = 1; matches = 0
-                        first = second = None
-                        waiting = False; game_over = False
-                        game_started = True; start_time = pygame.time.get_ticks()
-                        state = "game"
-
-                # Settings → Main
-                elif state == "settings":
-                    if sound_btn and sound_btn.collidepoint(mx, my):
-                        settings_data["sound"] = not settings_data["sound"]
-                        if settings_data["sound"]:
-                            pygame.mixer.music.unpause()
-                        else:
-                            pygame.mixer.music.pause()
-                        if settings_data["sound"]: button_sound.play()
-                    if slider_area.collidepoint(mx, my):
-                        rel = (mx - slider_x)/slider_w
-                        settings_data["volume"] = max(0, min(1, rel))
-                        for s in (flip_sound, game_over_sound, button_sound, match_sound):
-                            s.set_volume(settings_data["volume"])
-                        pygame.mixer.music.set_volume(settings_data["volume"])
-                    for i, btn in enumerate(bg_option_btns):
-                        if btn.collidepoint(mx, my):
-                            if settings_data["sound"]: button_sound.play()
-                            settings_data["background_color"] = bg_options[i][1]
-                    if back_btn and back_btn.collidepoint(mx, my):
-                        if settings_data["sound"]: button_sound.play()
-                        state = "main"
-                        game_mode = difficulty = None
-
-                # Hra – klik na kartu
-                elif state == "game" and game_started and not waiting and not game_over:
-                    for i in range(rows):
-                        for j in range(cols):
-                            idx = i*cols + j
-                            c   = cards[idx]
-                            if c["matched"] or c["revealed"]:
-                                continue
-                            x = gx + j*(size+margin)
-                            y = gy + i*(size+margin)
-                            if x <= mx <= x+size and y <= my <= y+size:
-                                c["revealed"] = True
-                                c["flip_progress"] = 1.0
-                                if settings_data["sound"]: flip_sound.play()
-                                if first is None:
-                                    first = idx
-                                elif second is None and first != idx:
-                                    second = idx
-                                    if game_mode=="multi":
-                                        if current==1: p1_moves+=1
-                                        else:          p2_moves+=1
-                                    else:
-                                        p1_moves+=1
-                                    if cards[first]["value"]==cards[second]["value"]:
-                                        cards[first]["matched"]=cards[second]["matched"]=True
-                                        matches += 1
-                                        if settings_data["sound"]: match_sound.play()
-                                        if game_mode=="multi":
-                                            if current==1: p1_score+=1
-                                            else:          p2_score+=1
-                                        else:
-                                            p1_score+=1
-                                        first=second=None
-                                    else:
-                                        waiting=True
-                                        wait_start=pygame.time.get_ticks()
-                                        if game_mode=="multi":
-                                            current=3-current
-
-        # Skrytie nesprávnych
-        if waiting and pygame.time.get_ticks()-wait_start>wait_ms:
-            cards[first]["revealed"]=False
-            cards[second]["revealed"]=False
-            first=second=None
-            waiting=False
-
-        # Animácia flip
-        for c in cards:
-            if c["revealed"] and c["flip_progress"]>0:
-                c["flip_progress"]=max(0,c["flip_progress"]-0.15)
-            elif not c["revealed"] and c["flip_progress"]<1:
-                c["flip_progress"]=min(1,c["flip_progress"]+0.15)
-
-        # Koniec hry
-        if game_started and matches==len(cards)//2 and not game_over:
-            game_over=True
-            if settings_data["sound"]: game_over_sound.play()
-            if game_mode=="multi":
-                if p1_score>p2_score:   winner="Víťaz: Hráč 1"
-                elif p2_score>p1_score: winner="Víťaz: Hráč 2"
-                else:                    winner="Remíza"
-            else:
-                winner=f"Získané páry: {p1_score}"
+    def resize(self, size):
+        resize(size)
+        if self.engine is not None:
+            self.grid = card_grid(self.engine.rows, self.engine.cols, self.zoom)
 
-        # --- VYKRESĽOVANIE ---
-        if settings_data["background_color"]:
-            screen.fill(settings_data["background_color"])
+    def start_game(self):
+        self.zoom = 1.0
+        self.engine, self.grid = init_game(boards[self.difficulty], self.game_mode,
+                                           clock=lambda: self.now, rng=self.rng)
+        self.game_started = True
+        self.state = "game"
+
+    def frame(self, events, render=True):
+        # jedna snímka; vráti False, keď hráč zavrel okno
+        profiler = self.profiler
+        profiler.begin_frame()
+        self.now = self.clock()
+        recorder = self.recorder
+        for event in events:
+            if recorder:
+                recorder.event(self.now, self.state, event)
+            if not self.handle_event(event):
+                return False
+        apply_volume()
+        profiler.lap("events")
+        self.update()
+        if recorder:
+            recorder.flush()
+        profiler.lap("update")
+        if render:
+            self.draw()
+            renderer.present()
+            profiler.lap("present")
+        profiler.end_frame(self.state)
+        return True
+
+    # Obsluha vstupu je v tabuľkách: druh udalosti -> metóda a pre kliknutia
+    # (stav, druh tlačidla) -> metóda; klik mimo tlačidiel dostane on_miss.
+    def handle_event(self, event):
+        # vráti False, keď sa má hra ukončiť
+        handler = self.event_handlers.get(event.type)
+        return handler is None or handler(event) is not False
+
+    def on_quit(self, event):
+        if PROFILE_OUT:
+            self.profiler.dump(PROFILE_OUT)
+        return False
+
+    def on_resize(self, event):
+        self.resize(event.size)
+
+    def on_expose(self, event):
+        renderer.invalidate()
+
+    def on_key(self, event):
+        if event.key == PROFILE_KEY:
+            self.profiler.overlay = not self.profiler.overlay
+            renderer.invalidate()
+
+    def on_motion(self, event):
+        # ťahom myšou na slider
+        if self.state == "settings" and event.buttons[0] and self.slider()[1].collidepoint(event.pos):
+            self.set_volume_at(event.pos[0])
+
+    def on_wheel(self, event):
+        # posúvanie a zoom veľkej plochy; mod nesie záznam, inak sa číta klávesnica
+        grid = self.grid
+        if self.state != "game" or grid is None:
+            return
+        mod = event.mod if hasattr(event, "mod") else pygame.key.get_mods()
+        if mod & pygame.KMOD_CTRL:
+            lo, hi = zoom_limits(grid.rows, grid.cols)
+            zoom = min(hi, max(lo, self.zoom * ZOOM_STEP**event.y))
+            if zoom == self.zoom:
+                return
+            # bod v strede okna ostane na mieste
+            cx, cy = width//2, height//2
+            old = grid.size + grid.margin
+            self.zoom = zoom
+            self.grid = card_grid(grid.rows, grid.cols, zoom)
+            new = self.grid.size + self.grid.margin
+            self.grid.gx = cx - round((cx - grid.gx) * new / old)
+            self.grid.gy = cy - round((cy - grid.gy) * new / old)
         else:
-            draw_gradient()
+            dx, dy = (-event.y, 0) if mod & pygame.KMOD_SHIFT else (event.x, event.y)
+            pitch = grid.size + grid.margin
+            grid.gx -= dx * pitch
+            grid.gy += dy * pitch
+        self.grid.clamp(width, height)
+        renderer.invalidate()
+
+    def on_click(self, event):
+        if wheel_click(event):
+            return
+        pos = event.pos
+        # Nastavenia ikona (len mimo hry)
+        if self.state != "game" and self.settings_icon_hit(pos):
+            play_sound("button")
+            self.state = "settings"
+            return
+        hit = menu_layout(self.state)[1].hit(pos)
+        handler = self.click_handlers.get((self.state, hit[0])) if hit else None
+        if handler is not None:
+            handler(hit[1])
+        elif self.state in self.miss_handlers:
+            self.miss_handlers[self.state](pos)
+
+    def settings_icon_hit(self, pos):
+        dx = pos[0] - settings_circle_center[0]
+        dy = pos[1] - settings_circle_center[1]
+        rect_txt = pygame.Rect((0, 0), get_font("subtitle").size("Nastavenia"))
+        rect_txt.midleft = (settings_circle_center[0]+settings_circle_radius+px(10),
+                            settings_circle_center[1])
+        return math.hypot(dx, dy) <= settings_circle_radius or rect_txt.collidepoint(pos)
+
+    # Main → Submenu
+    def on_start(self, n):
+        play_sound("button")
+        self.state = "submenu"
+
+    # Submenu → Game
+    def on_player(self, n):
+        play_sound("button")
+        self.game_mode = ["single", "multi"][n]
+
+    def on_difficulty(self, n):
+        play_sound("button")
+        self.difficulty = board_names[n]
+
+    def on_play(self, n):
+        if self.game_mode and self.difficulty:
+            play_sound("button")
+            self.start_game()
+
+    # Settings → Main
+    def on_sound(self, n):
+        set_sound(not settings_data["sound"])
+        play_sound("button")
+        self.settings_changed()
+
+    def on_background(self, n):
+        play_sound("button")
+        settings_data["background_color"] = bg_options[n][1]
+        self.settings_changed()
+
+    def on_back(self, n):
+        play_sound("button")
+        self.state = "main"
+        self.game_mode = self.difficulty = None
+
+    def on_slider(self, pos):
+        if self.slider()[1].collidepoint(pos):
+            self.set_volume_at(pos[0])
+
+    # MENU počas hry
+    def on_menu(self, n):
+        play_sound("button")
+        self.state = "main"
+        self.game_mode = self.difficulty = None
+        self.game_started = False
+
+    # Hra – klik na kartu
+    def on_board(self, pos):
+        if self.game_started:
+            self.click_card(pos)
+
+    def click_card(self, pos):
+        if self.engine.can_flip():
+            idx = self.grid.card_at(pos)
+            if idx is not None:
+                events = self.engine.flip(idx)
+                play_events(events)
+                if "game_over" in events and self.store is not None:
+                    self.store.record_game(game_result(self.engine, self.difficulty))
+
+    def update(self):
+        # Skrytie nesprávnych + animácia flip
+        self.flipping = False
+        if self.engine is not None:
+            if self.auto_tick:
+                self.tick()
+            self.flipping = self.engine.board.step_flip()
+
+    def tick(self):
+        # časovače pravidiel (skrytie nesprávneho páru)
+        events = self.engine.update()
+        if events and self.recorder:
+            self.recorder.tick(self.now)
+        play_events(events)
+
+    def draw(self):
+        profiler = self.profiler
+        state = self.state
+        pulse = 1 + 0.05 * math.sin(self.now/1000 * PULSE_RATE)
+
+        # vyber schémy
+        scheme = color_schemes[settings_data["background_color"]]
+        btn_col        = scheme["button"]
+
+        renderer.begin((state, settings_data["background_color"], width, height))
+        draw_background()
+        profiler.lap("background")
+        btns = menu_layout(state)[0]
 
         if state!="game":
+            settings_label = render_text(get_font("subtitle"),"Nastavenia",WHITE)
             pygame.draw.circle(screen, btn_col, settings_circle_center, settings_circle_radius)
             pygame.draw.circle(screen, DARK_GRAY,
-                               (settings_circle_center[0]+3, settings_circle_center[1]+3),
+                               (settings_circle_center[0]+px(3), settings_circle_center[1]+px(3)),
                                settings_circle_radius)
-            screen.blit(settings_label_sh,(
-                settings_circle_center[0]+settings_circle_radius+10+3,
-                settings_circle_center[1]-settings_label.get_height()/2+3))
+            screen.blit(render_text(get_font("subtitle"),"Nastavenia",DARK_GRAY),(
+                settings_circle_center[0]+settings_circle_radius+px(10)+px(3),
+                settings_circle_center[1]-settings_label.get_height()/2+px(3)))
             screen.blit(settings_label,(
-                settings_circle_center[0]+settings_circle_radius+10,
+                settings_circle_center[0]+settings_circle_radius+px(10),
                 settings_circle_center[1]-settings_label.get_height()/2))
 
         if state=="main":
-            screen.blit(title_shadow,(title_rect.x+5,title_rect.y+5))
-            screen.blit(title_surf,title_rect)
-            start_btn=draw_button("Štart",btn_col,center=(width//2,height//2),inflate=(200,50),pulse=pulse)
+            draw_title()
+            draw_button(color=btn_col,pulse=pulse,**btns[("start",0)])
 
         elif state=="submenu":
-            screen.blit(title_shadow,(title_rect.x+5,title_rect.y+5))
-            screen.blit(title_surf,title_rect)
-            sub1=subtitle_font.render("POČET HRÁČOV",True,WHITE)
-            sub1s=subtitle_font.render("POČET HRÁČOV",True,DARK_GRAY)
-            r1=sub1.get_rect(center=(width//2,250))
-            screen.blit(sub1s,(r1.x+3,r1.y+3));screen.blit(sub1,r1)
-            sub2=subtitle_font.render("OBTIAŽNOSŤ",True,WHITE)
-            sub2s=subtitle_font.render("OBTIAŽNOSŤ",True,DARK_GRAY)
-            r2=sub2.get_rect(center=(width//2,450))
-            screen.blit(sub2s,(r2.x+3,r2.y+3));screen.blit(sub2,r2)
-            player_btns=[]
-            for i,txt in enumerate(["1 Hráč","2 Hráči"]):
-                x=width//2+(i*200-100)
-                col=btn_col if game_mode==["single","multi"][i] else DARK_GRAY
-                btn=draw_button(txt,col,center=(x,350),inflate=(150,50))
-                player_btns.append(btn)
-            diff_btns=[]
-            for i,txt in enumerate(["Ľahká","Stredná","Ťažká"]):
-                x=width//2+(i*200-200)
-                col=btn_col if difficulty==["easy","medium","hard"][i] else DARK_GRAY
-                btn=draw_button(txt,col,center=(x,530),inflate=(150,50))
-                diff_btns.append(btn)
-            play_btn=draw_button("HRAŤ",btn_col,center=(width//2,700),inflate=(150,50),pulse=pulse)
+            draw_title()
+            sub1=render_text(get_font("subtitle"),"POČET HRÁČOV",WHITE)
+            sub1s=render_text(get_font("subtitle"),"POČET HRÁČOV",DARK_GRAY)
+            r1=sub1.get_rect(center=(ux(0),uy(250)))
+            screen.blit(sub1s,(r1.x+px(3),r1.y+px(3)));screen.blit(sub1,r1)
+            sub2=render_text(get_font("subtitle"),"OBTIAŽNOSŤ",WHITE)
+            sub2s=render_text(get_font("subtitle"),"OBTIAŽNOSŤ",DARK_GRAY)
+            r2=sub2.get_rect(center=(ux(0),uy(450)))
+            screen.blit(sub2s,(r2.x+px(3),r2.y+px(3)));screen.blit(sub2,r2)
+            for i,mode in enumerate(["single","multi"]):
+                col=btn_col if self.game_mode==mode else DARK_GRAY
+                draw_button(color=col,**btns[("player",i)])
+            for i,diff in enumerate(board_names):
+                col=btn_col if self.difficulty==diff else DARK_GRAY
+                draw_button(color=col,**btns[("diff",i)])
+            draw_button(color=btn_col,pulse=pulse,**btns[("play",0)])
 
         elif state=="settings":
-            screen.blit(title_shadow,(title_rect.x+5,title_rect.y+5))
-            screen.blit(title_surf,title_rect)
-            hdr=subtitle_font.render("NASTAVENIA",True,WHITE)
-            screen.blit(hdr,(width//2-hdr.get_width()//2,180))
-            bg_option_btns=[]
+            draw_title()
+            hdr=render_text(get_font("subtitle"),"NASTAVENIA",WHITE)
+            screen.blit(hdr,(width//2-hdr.get_width()//2,uy(180)))
             for i,(label,color_val) in enumerate(bg_options):
-                y=220+i*80
                 col=color_val if color_val is not None else DARK_GRAY
-                btn=draw_button(label,col,center=(width//2,y),inflate=(300,60))
-                bg_option_btns.append(btn)
-            sound_text="Zvuk: Zapnutý" if settings_data["sound"] else "Zvuk: Vypnutý"
-            sound_btn=draw_button(sound_text,btn_col,center=(width//2,220+len(bg_options)*80),inflate=(300,60))
+                draw_button(color=col,**btns[("bg",i)])
+            draw_button(color=btn_col,**btns[("sound",0)])
             # slider
+            slider_rect,slider_area,knob_r=self.slider()
             pygame.draw.rect(screen,WHITE,slider_rect)
-            knob_x=slider_x+settings_data["volume"]*slider_w
-            knob_y=slider_y+slider_h//2
+            knob_x=slider_rect.x+settings_data["volume"]*slider_rect.w
+            knob_y=slider_rect.y+slider_rect.h//2
             pygame.draw.circle(screen,btn_col,(int(knob_x),knob_y),knob_r)
-            back_btn=draw_button("Späť",btn_col,center=(width//2,height-100),inflate=(200,50))
+            renderer.mark("slider",slider_area,int(knob_x))
+            draw_button(color=btn_col,**btns[("back",0)])
 
         else:  # game
-            for i in range(rows):
-                for j in range(cols):
-                    idx=i*cols+j; c=cards[idx]
-                    x=gx+j*(size+margin); y=gy+i*(size+margin)
-                    t=c["flip_progress"]
-                    scale=1-0.3*abs(math.cos(math.pi*t))
-                    surf=pygame.Surface((size,size),pygame.SRCALPHA)
-                    fb,bb=card_front_col,card_back_col
-                    col=(int(fb[0]*t+bb[0]*(1-t)),int(fb[1]*t+bb[1]*(1-t)),int(fb[2]*t+bb[2]*(1-t)))
-                    draw_col=GRAY if c["matched"] else col
-                    pygame.draw.rect(surf,draw_col,(0,0,size,size),border_radius=10)
-                    if t<=0.5 and not c["matched"]:
-                        txt=card_surfs[c["value"]]; tr=txt.get_rect(center=(size//2,size//2))
-                        surf.blit(txt,tr)
-                    scaled=pygame.transform.smoothscale(surf,(int(size*scale),int(size*scale)))
-                    screen.blit(scaled,(
-                        x+(size-scaled.get_width())//2,
-                        y+(size-scaled.get_height())//2))
-            elapsed=(pygame.time.get_ticks()-start_time)//1000
-            screen.blit(info_font.render(f"Hráč {current} na rade",True,WHITE),(10,10))
-            screen.blit(info_font.render(f"Hráč 1: {p1_score} (Ťahy: {p1_moves})",True,WHITE),(10,50))
-            if game_mode=="multi":
-                screen.blit(info_font.render(f"Hráč 2: {p2_score} (Ťahy: {p2_moves})",True,WHITE),(10,90))
-                screen.blit(info_font.render(f"Čas: {elapsed}s",True,WHITE),(10,130))
-            else:
-                screen.blit(info_font.render(f"Čas: {elapsed}s",True,WHITE),(10,90))
-            if game_over:
-                msg_surf=title_font.render(winner,True,WHITE)
-                msg_rect=msg_surf.get_rect(center=(width//2,height//2-50))
-                pygame.draw.rect(screen,btn_col,msg_rect.inflate(50,30),border_radius=15)
+            engine=self.engine
+            draw_cards(engine.board,self.grid,scheme)
+            profiler.lap("cards")
+            elapsed=(self.now-engine.start_time)//1000
+            scores,moves=engine.scores,engine.moves
+            hud=[f"Hráč {engine.current} na rade",f"Hráč 1: {scores[0]} (Ťahy: {moves[0]})"]
+            if engine.mode=="multi":
+                hud.append(f"Hráč 2: {scores[1]} (Ťahy: {moves[1]})")
+            hud.append(f"Čas: {elapsed}s")
+            for n,line in enumerate(hud):
+                r=screen.blit(render_text(get_font("info"),line,WHITE),(px(10),px(10)+n*px(40)))
+                renderer.mark(("hud",n),r,line)
+            if engine.game_over:
+                winner=winner_text(engine)
+                msg_surf=render_text(get_font("title"),winner,WHITE)
+                msg_rect=msg_surf.get_rect(center=(width//2,height//2-px(50)))
+                pygame.draw.rect(screen,btn_col,msg_rect.inflate(px(50),px(30)),border_radius=px(15))
                 screen.blit(msg_surf,msg_rect)
-            menu_during_btn=draw_button("MENU",btn_col,corner=(width-20,height-20),inflate=(20,20),pulse=1.0)
+                renderer.mark("game_over",msg_rect.inflate(px(50),px(30)),winner)
+            draw_button(color=btn_col,**btns[("menu",0)])
+
+        profiler.draw_overlay(screen,[a.report() for a in card_atlases.values()]+[text_cache.report()])
+        profiler.lap("hud" if state=="game" else "menu")
+
+    def next_frame(self):
+        # (fps, termín) pre plánovač: plná frekvencia len keď sa niečo hýbe
+        if self.flipping:
+            return ANIM_FPS, None
+        if self.state in ("main", "submenu"):
+            return PULSE_FPS, None
+        engine = self.engine
+        settle = background_deadline()
+        if self.state != "game" or engine.game_over:
+            return None, settle
+        now = self.clock()
+        deadline = now + 1000 - (now - engine.start_time) % 1000
+        if engine.waiting:
+            deadline = min(deadline, engine.deadline())
+        if settle is not None:
+            deadline = min(deadline, settle)
+        return None, deadline
+
+# -----------------------
+# Relácie (viac hier v jednom procese)
+# -----------------------
+# Session je hra s vlastnými nastaveniami, časovačmi a povrchom mimo
+# obrazovky. Počas jej snímky sa na ňu prepnú globálne screen, settings_data,
+# renderer a mierka (bound_session); fonty, písmená, pozadia, atlasy kariet
+# a zvuky ostávajú spoločné. Snímka relácie je synchrónna, takže pri
+# asyncio sa relácie nemôžu prekryť. Hostiteľ je v pexeso_host.py.
+@contextmanager
+def bound_session(session):
+    global screen, settings_data, renderer
+    saved = (screen, settings_data, renderer, (width, height))
+    screen, settings_data, renderer = session.surface, session.settings, session.renderer
+    set_view(session.surface.get_size())
+    try:
+        yield
+    finally:
+        screen, settings_data, renderer, view = saved
+        set_view(view)
+
+class Session(Game):
+    def __init__(self, size, settings=None, seed=None, clock=pygame.time.get_ticks, composited=True):
+        self.surface = pygame.Surface(size)
+        self.settings = dict(settings or settings_data)
+        self.renderer = OffscreenRenderer(composited)
+        self.inbox = []
+        self.wake = asyncio.Event()
+        self.costs = deque(maxlen=PROFILE_WINDOW)  # s práce na snímku
+        self.alive = True
+        super().__init__(seed=seed, clock=clock)
 
-        pygame.display.flip()
-        clock.tick(FPS)
-        await asyncio.sleep(1/ FPS)
+    def resize(self, size):
+        self.surface = pygame.Surface(size)
+        self.renderer.invalidate()
+        if self.engine is not None:
+            with bound_session(self):
+                self.grid = card_grid(self.engine.rows, self.engine.cols, self.zoom)
+
+    def start(self, difficulty, mode="single"):
+        self.difficulty, self.game_mode = difficulty, mode
+        with bound_session(self):
+            self.start_game()
+
+    def post(self, event):
+        # vstup od hostiteľa v súradniciach povrchu relácie
+        self.inbox.append(event)
+        self.wake.set()
+
+    def step(self, render=True):
+        events, self.inbox = collapse_motion(self.inbox), []
+        t = time.perf_counter()
+        with bound_session(self):
+            self.alive = self.frame(events, render)
+        self.costs.append(time.perf_counter() - t)
+        return self.alive
+
+    async def run(self, render=True):
+        while self.step(render):
+            fps, deadline = self.next_frame()
+            delay = 1000/fps if fps else IDLE_MS
+            if deadline is not None:
+                delay = min(delay, deadline - self.clock())
+            self.wake.clear()
+            if fps:
+                await asyncio.sleep(max(0, delay)/1000)
+            else:
+                try:
+                    await asyncio.wait_for(self.wake.wait(), max(0, delay)/1000)
+                except asyncio.TimeoutError:
+                    pass
+
+    def cost(self):
+        # práca na snímku v ms (p50, p95) a počet snímok v okne
+        if not self.costs:
+            return 0.0, 0.0, 0
+        p50, p95 = np.percentile(np.fromiter(self.costs, float), (50, 95)) * 1000
+        return float(p50), float(p95), len(self.costs)
+
+# -----------------------
+# Záznam a prehrávanie
+# -----------------------
+# Súbor: hlavička (REC_MAGIC, seed, JSON s nastaveniami, veľkosťou okna
+# a turnajovými plochami) a potom 9-bajtové záznamy (čas snímky v ms od
+# štartu, druh | tlačidlo << 4, x, y). Zaznamenávajú sa kliky, ťahanie
+# slidera, koliesko na ploche, zmeny veľkosti okna, zatvorenie okna a snímky,
+# v ktorých časovač skryl nesprávny pár. PEXESO_RECORD=cesta nahráva hru; PEXESO_REPLAY=cesta ju
+# prehrá rýchlosťou PEXESO_REPLAY_SPEED (0 = čo najrýchlejšie, bez kreslenia).
+REC_MAGIC  = b"PXR2"
+REC_HEADER = struct.Struct("<QH")
+REC_ITEM   = struct.Struct("<IBhh")
+REC_QUIT, REC_CLICK, REC_DRAG, REC_TICK, REC_RESIZE, REC_WHEEL = range(6)
+REC_CTRL, REC_SHIFT = 1, 2  # príznaky pri REC_WHEEL v hornej polovici bajtu
+
+RECORD_PATH  = os.environ.get("PEXESO_RECORD")
+REPLAY_PATH  = os.environ.get("PEXESO_REPLAY")
+REPLAY_SPEED = float(os.environ.get("PEXESO_REPLAY_SPEED", "1"))
+
+class Recorder:
+    def __init__(self, path, game):
+        self.f = open(path, "wb")
+        self.t0 = game.now
+        self.pending = False
+        meta = json.dumps({"settings": settings_data, "size": [width, height],
+                           "boards": board_names[3:]}).encode()
+        self.f.write(REC_MAGIC + REC_HEADER.pack(game.seed, len(meta)) + meta)
+
+    def write(self, now, kind, pos=(0, 0)):
+        self.f.write(REC_ITEM.pack(now - self.t0, kind, pos[0], pos[1]))
+        self.pending = True
+
+    def event(self, now, state, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and not wheel_click(event):
+            self.write(now, REC_CLICK | event.button << 4, event.pos)
+        elif event.type == pygame.MOUSEMOTION and state == "settings" and event.buttons[0]:
+            self.write(now, REC_DRAG, event.pos)
+        elif event.type == pygame.VIDEORESIZE:
+            self.write(now, REC_RESIZE, event.size)
+        elif event.type == pygame.MOUSEWHEEL and state == "game":
+            mod = pygame.key.get_mods()
+            flags = (REC_CTRL if mod & pygame.KMOD_CTRL else 0) | (REC_SHIFT if mod & pygame.KMOD_SHIFT else 0)
+            self.write(now, REC_WHEEL | flags << 4, (event.x, event.y))
+        elif event.type == pygame.QUIT:
+            self.write(now, REC_QUIT)
+
+    def tick(self, now):
+        self.write(now, REC_TICK)
+
+    def flush(self):
+        # po každej snímke so vstupom, aby záznam prežil aj pád hry
+        if self.pending:
+            self.f.flush()
+            self.pending = False
+
+    def close(self):
+        self.f.close()
+
+def load_recording(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != REC_MAGIC:
+        raise ValueError(f"{path}: nie je záznam Pexesa")
+    seed, n = REC_HEADER.unpack_from(data, 4)
+    start = 4 + REC_HEADER.size
+    meta = json.loads(data[start:start+n])
+    return seed, meta, list(REC_ITEM.iter_unpack(data[start+n:]))
+
+def recorded_event(kind, x, y):
+    kind, button = kind & 15, kind >> 4
+    if kind == REC_CLICK:
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=button, pos=(x, y))
+    if kind == REC_DRAG:
+        return pygame.event.Event(pygame.MOUSEMOTION, pos=(x, y), rel=(0, 0), buttons=(1, 0, 0))
+    if kind == REC_RESIZE:
+        return pygame.event.Event(pygame.VIDEORESIZE, size=(x, y), w=x, h=y)
+    if kind == REC_WHEEL:
+        mod = (pygame.KMOD_CTRL if button & REC_CTRL else 0) | (pygame.KMOD_SHIFT if button & REC_SHIFT else 0)
+        return pygame.event.Event(pygame.MOUSEWHEEL, x=x, y=y, mod=mod)
+    return pygame.event.Event(pygame.QUIT)
+
+def replay(path, speed=0.0):
+    # speed 1 = reálny čas s kreslením, 0 = virtuálny čas bez kreslenia;
+    # vráti hru v stave po poslednom zázname
+    global width, height
+    seed, meta, items = load_recording(path)
+    load_settings(meta["settings"])
+    width, height = meta["size"]
+    for spec in meta.get("boards", ()):
+        if spec not in boards:
+            add_board(spec)
+    layout_cache.clear()
+    if speed:
+        startup()
+    else:
+        pygame.font.init()
+        resize((width, height))
+    clock = VirtualClock()
+    game = Game(seed=seed, clock=clock)
+    game.auto_tick = False
+    start = time.perf_counter()
+    for t, kind, x, y in items:
+        while speed:
+            clock.now = int((time.perf_counter() - start) * 1000 * speed)
+            if clock.now >= t:
+                break
+            if not game.frame([e for e in pygame.event.get() if e.type == pygame.QUIT]):
+                return game
+            pygame.time.wait(1000 // ANIM_FPS)
+        clock.now = game.now = t
+        if kind == REC_TICK:
+            game.tick()
+        elif not game.handle_event(recorded_event(kind, x, y)):
+            break
+    return game
+
+def replay_summary(game):
+    engine = game.engine
+    if engine is None:
+        return f"stav {game.state}, žiadna hra"
+    return (f"stav {game.state}, {winner_text(engine)}, ťahy {engine.moves}, "
+            f"skóre {engine.scores}, čas {engine.elapsed_ms()/1000:.1f}s")
+
+# -----------------------
+# Hlavná slučka
+# -----------------------
+async def main():
+    store = open_store()
+    startup()
+    game = Game()
+    game.store = store
+    if RECORD_PATH:
+        game.recorder = Recorder(RECORD_PATH, game)
+    scheduler = FrameScheduler()
+    while game.frame(scheduler.events(game.state)):
+        poll_audio()
+        if STARTUP_TIMINGS and "prvá snímka" not in startup_times:
+            startup_times["prvá snímka"] = (time.perf_counter() - T0) * 1000
+        if STARTUP_TIMINGS and audio_ready.is_set() and "spolu" not in startup_times:
+            startup_times["spolu"] = (time.perf_counter() - T0) * 1000
+            print(startup_report())
+        fps, deadline = game.next_frame()
+        if store is not None:
+            store.poll()
+        await scheduler.wait(fps, deadline)
+    if game.recorder:
+        game.recorder.close()
+    if store is not None:
+        store.close()
 
-if platform.system()=="Emscripten":
-    asyncio.ensure_future(main())
-else:
-    asyncio.run(main())
+if __name__ == "__main__":
+    if REPLAY_PATH:
+        print(replay_summary(replay(REPLAY_PATH, REPLAY_SPEED)))
+    elif EMSCRIPTEN:
+        asyncio.ensure_future(main())
+    else:
+        asyncio.run(main())
@@ -0,0 +1,372 @@
+import argparse
+import os
+import random
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# -----------------------
+# Pravidlá Pexesa bez Pygame
+# -----------------------
+# Tento modul nepotrebuje displej, mixer ani reálny čas: hodiny sa dajú
+# podstrčiť (clock), takže rovnaké pravidlá používa hra aj hromadná simulácia.
+
+FLIP_STEP = 0.15  # krok animácie otáčania na snímku
+WAIT_MS   = 1000  # ako dlho ostane nesprávny pár odkrytý
+
+# -----------------------
+# Výber obtiažnosti
+# -----------------------
+difficulties = {
+    "easy":   {"rows": 4, "cols": 2, "values": list("AABBCCDD")},
+    "medium": {"rows": 4, "cols": 4, "values": list("AABBCCDDEEFFGGHH")},
+    "hard":   {"rows": 6, "cols": 4, "values": list("AABBCCDDEEFFGGHHIIJJKKLL")},
+}
+
+def pair_label(i):
+    # A..Z, potom AA, AB, ... ako stĺpce v tabuľkovom procesore
+    label = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        label = chr(65 + r) + label
+    return label
+
+def make_settings(rows, cols):
+    # ľubovoľná plocha (aj turnajová so stovkami párov); hodnoty z pair_label
+    if rows < 1 or cols < 1 or rows * cols % 2:
+        raise ValueError(f"nepodporovaná plocha {rows}x{cols}")
+    pairs = rows * cols // 2
+    return {"rows": rows, "cols": cols, "values": [pair_label(i) for i in range(pairs) for _ in (0, 1)]}
+
+# -----------------------
+# Stav hracej plochy
+# -----------------------
+# Karty sú uložené po stĺpcoch v poliach NumPy (hodnota, odkrytá, spárovaná,
+# priebeh otáčania), takže animácia aj kontrola konca hry sú jedna vektorová
+# operácia bez ohľadu na veľkosť plochy.
+class Board:
+    def __init__(self, values):
+        self.labels = sorted(set(values))
+        codes = {v: i for i, v in enumerate(self.labels)}
+        self.values   = np.array([codes[v] for v in values], dtype=np.int32)
+        self.revealed = np.zeros(len(values), dtype=bool)
+        self.matched  = np.zeros(len(values), dtype=bool)
+        self.flip     = np.zeros(len(values), dtype=np.float64)
+
+    def __len__(self):
+        return len(self.values)
+
+    def value(self, i):
+        return self.labels[self.values[i]]
+
+    def can_reveal(self, i):
+        return not (self.revealed[i] or self.matched[i])
+
+    def reveal(self, i):
+        self.revealed[i] = True
+        self.flip[i] = 1.0
+
+    def is_match(self, i, j):
+        return self.values[i] == self.values[j]
+
+    def hidden(self):
+        return np.flatnonzero(~self.matched)
+
+    def all_matched(self):
+        return bool(self.matched.all())
+
+    def step_flip(self, step=FLIP_STEP):
+        # posunie všetky karty o krok k cieľu; vráti, či sa niečo pohlo
+        target = np.where(self.revealed, 0.0, 1.0)
+        if not (self.flip != target).any():
+            return False
+        np.clip(self.flip + np.where(self.revealed, -step, step), 0.0, 1.0, out=self.flip)
+        return True
+
+# -----------------------
+# Priebeh hry
+# -----------------------
+def default_clock():
+    return int(time.monotonic() * 1000)
+
+class Engine:
+    # flip() a update() vracajú zoznam udalostí ("flip", "match", "mismatch",
+    # "hide", "game_over"), na ktoré UI reaguje zvukom a prekreslením.
+    def __init__(self, settings, mode="single", clock=default_clock, rng=random, wait_ms=WAIT_MS):
+        self.rows, self.cols = settings["rows"], settings["cols"]
+        vals = list(settings["values"])
+        rng.shuffle(vals)
+        self.board = Board(vals)
+        self.mode = mode
+        self.clock = clock
+        self.wait_ms = wait_ms
+        self.current = 1
+        self.scores = [0, 0]
+        self.moves = [0, 0]
+        self.first = self.second = None
+        self.waiting = False
+        self.wait_start = 0
+        self.game_over = False
+        self.start_time = clock()
+        self.end_time = None
+
+    def can_flip(self):
+        return not self.waiting and not self.game_over
+
+    def flip(self, idx):
+        board = self.board
+        if not self.can_flip() or not board.can_reveal(idx):
+            return []
+        board.reveal(idx)
+        events = ["flip"]
+        if self.first is None:
+            self.first = idx
+            return events
+        self.second = idx
+        player = self.current - 1
+        self.moves[player] += 1
+        if board.is_match(self.first, self.second):
+            board.matched[[self.first, self.second]] = True
+            self.scores[player] += 1
+            self.first = self.second = None
+            events.append("match")
+            if board.all_matched():
+                self.game_over = True
+                self.end_time = self.clock()
+                events.append("game_over")
+        else:
+            self.waiting = True
+            self.wait_start = self.clock()
+            if self.mode == "multi":
+                self.current = 3 - self.current
+            events.append("mismatch")
+        return events
+
+    def resolve(self):
+        # okamžite skryje nesprávny pár (simulácia nečaká na časovač)
+        if not self.waiting:
+            return []
+        self.board.revealed[[self.first, self.second]] = False
+        self.first = self.second = None
+        self.waiting = False
+        return ["hide"]
+
+    def update(self):
+        if self.waiting and self.clock() - self.wait_start > self.wait_ms:
+            return self.resolve()
+        return []
+
+    def deadline(self):
+        # najbližší čas, kedy sa stav zmení bez vstupu (alebo None)
+        return self.wait_start + self.wait_ms + 1 if self.waiting else None
+
+    def apply_move(self, a, b):
+        # celý ťah naraz: dve karty a vyhodnotenie; vráti, či to bol pár
+        self.flip(a)
+        events = self.flip(b)
+        self.resolve()
+        return "match" in events
+
+    def elapsed_ms(self):
+        return (self.end_time if self.end_time is not None else self.clock()) - self.start_time
+
+    def winner(self):
+        # 1 alebo 2 v hre dvoch hráčov, 0 pri remíze, None pre jedného hráča
+        if self.mode != "multi":
+            return None
+        if self.scores[0] > self.scores[1]:
+            return 1
+        if self.scores[1] > self.scores[0]:
+            return 2
+        return 0
+
+# -----------------------
+# Boti
+# -----------------------
+# Boti vidia len to, čo hráč: hodnoty kariet, ktoré boli odkryté.
+class RandomBot:
+    def __init__(self, rng):
+        self.rng = rng
+
+    def observe(self, idx, value):
+        pass
+
+    def forget(self, idx):
+        pass
+
+    def pick(self, hidden, first=None, first_value=None):
+        choices = [i for i in hidden if i != first]
+        return self.rng.choice(choices)
+
+class MemoryBot(RandomBot):
+    # capacity=None znamená dokonalú pamäť, inak si pamätá posledných N kariet
+    def __init__(self, rng, capacity=None):
+        super().__init__(rng)
+        self.capacity = capacity
+        self.seen = OrderedDict()  # index -> hodnota
+
+    def observe(self, idx, value):
+        self.seen[idx] = value
+        self.seen.move_to_end(idx)
+        if self.capacity is not None and len(self.seen) > self.capacity:
+            self.seen.popitem(last=False)
+
+    def forget(self, idx):
+        self.seen.pop(idx, None)
+
+    def pick(self, hidden, first=None, first_value=None):
+        if first is None:
+            by_value = {}
+            for i, v in self.seen.items():
+                if v in by_value:
+                    return by_value[v]
+                by_value[v] = i
+        else:
+            for i, v in self.seen.items():
+                if v == first_value and i != first:
+                    return i
+        unknown = [i for i in hidden if i != first and i not in self.seen]
+        if unknown:
+            return self.rng.choice(unknown)
+        return super().pick(hidden, first)
+
+strategies = {
+    "random":  lambda rng, memory: RandomBot(rng),
+    "perfect": lambda rng, memory: MemoryBot(rng),
+    "memory":  lambda rng, memory: MemoryBot(rng, memory),
+}
+
+class VirtualClock:
+    def __init__(self, start=0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now += ms
+
+def play_game(settings, mode="single", players=("perfect",), memory=4, rng=random, move_ms=1000):
+    # jedna hra botov; move_ms je virtuálny čas jedného ťahu
+    clock = VirtualClock()
+    engine = Engine(settings, mode=mode, clock=clock, rng=rng)
+    if mode == "multi" and len(players) == 1:
+        players = players * 2
+    bots = [strategies[name](rng, memory) for name in players]
+    values = engine.board.values
+    while not engine.game_over:
+        bot = bots[engine.current - 1]
+        hidden = engine.board.hidden().tolist()
+        a = bot.pick(hidden)
+        engine.flip(a)
+        for b in bots:
+            b.observe(a, int(values[a]))
+        c = bot.pick(hidden, a, int(values[a]))
+        matched = "match" in engine.flip(c)
+        for b in bots:
+            b.observe(c, int(values[c]))
+            if matched:
+                b.forget(a)
+                b.forget(c)
+        engine.resolve()
+        clock.advance(move_ms)
+    return {
+        "moves": sum(engine.moves),
+        "scores": tuple(engine.scores),
+        "winner": engine.winner(),
+        "elapsed_ms": engine.elapsed_ms(),
+    }
+
+# -----------------------
+# Hromadná simulácia
+# -----------------------
+def _empty_stats():
+    return {"games": 0, "moves_sum": 0, "moves_sq": 0, "moves_min": None, "moves_max": 0,
+            "scores": [0, 0], "wins": [0, 0, 0]}  # wins: remíza, hráč 1, hráč 2
+
+def _merge(total, part):
+    total["games"] += part["games"]
+    total["moves_sum"] += part["moves_sum"]
+    total["moves_sq"] += part["moves_sq"]
+    if part["moves_min"] is not None:
+        total["moves_min"] = part["moves_min"] if total["moves_min"] is None else min(total["moves_min"], part["moves_min"])
+    total["moves_max"] = max(total["moves_max"], part["moves_max"])
+    for i in range(2):
+        total["scores"][i] += part["scores"][i]
+    for i in range(3):
+        total["wins"][i] += part["wins"][i]
+    return total
+
+def _play_chunk(args):
+    settings, mode, players, memory, games, seed = args
+    rng = random.Random(seed)
+    stats = _empty_stats()
+    for _ in range(games):
+        r = play_game(settings, mode, players, memory, rng)
+        m = r["moves"]
+        part = {"games": 1, "moves_sum": m, "moves_sq": m*m, "moves_min": m, "moves_max": m,
+                "scores": list(r["scores"]), "wins": [0, 0, 0]}
+        if r["winner"] is not None:
+            part["wins"][r["winner"]] = 1
+        _merge(stats, part)
+    return stats
+
+def run_batch(settings, games, mode="single", players=("perfect",), memory=4,
+              workers=None, seed=0, chunk=5000):
+    # rozdelí hry na bloky s vlastným semienkom, výsledok je reprodukovateľný
+    jobs = []
+    for n, start in enumerate(range(0, games, chunk)):
+        jobs.append((settings, mode, tuple(players), memory, min(chunk, games - start), seed + n))
+    total = _empty_stats()
+    if workers == 1:
+        for job in jobs:
+            _merge(total, _play_chunk(job))
+    else:
+        # až tu: multiprocessing stojí pri importe ~20 ms a v prehliadači chýba
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(_play_chunk, jobs):
+                _merge(total, part)
+    n = total["games"] or 1
+    mean = total["moves_sum"] / n
+    total["moves_mean"] = mean
+    total["moves_std"] = max(0.0, total["moves_sq"] / n - mean*mean) ** 0.5
+    return total
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Hromadná simulácia Pexesa bez grafiky.")
+    ap.add_argument("--games", type=int, default=100000)
+    ap.add_argument("--difficulty", choices=sorted(difficulties), default="hard")
+    ap.add_argument("--rows", type=int, help="vlastný počet riadkov (spolu s --cols)")
+    ap.add_argument("--cols", type=int)
+    ap.add_argument("--mode", choices=["single", "multi"], default="single")
+    ap.add_argument("--strategy", action="append", choices=sorted(strategies),
+                    help="stratégia hráča; pri dvoch hráčoch sa dá zadať dvakrát")
+    ap.add_argument("--memory", type=int, default=4, help="kapacita pamäte pre stratégiu 'memory'")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    if (args.rows is None) != (args.cols is None):
+        ap.error("--rows a --cols treba zadať spolu")
+
+    if args.rows is not None:
+        try:
+            settings = make_settings(args.rows, args.cols)
+        except ValueError as e:
+            ap.error(str(e))
+    else:
+        settings = difficulties[args.difficulty]
+    players = tuple(args.strategy or ["perfect"])
+    t = time.perf_counter()
+    r = run_batch(settings, args.games, args.mode, players, args.memory, args.workers, args.seed)
+    dt = time.perf_counter() - t
+    print(f"hier: {r['games']}  ({r['games']/dt:.0f} hier/s, {args.workers} procesov)")
+    print(f"ťahy: priemer {r['moves_mean']:.2f}  sd {r['moves_std']:.2f}  min {r['moves_min']}  max {r['moves_max']}")
+    if args.mode == "multi":
+        draws, p1, p2 = r["wins"]
+        print(f"výhry: hráč 1 {p1/r['games']:.3f}  hráč 2 {p2/r['games']:.3f}  remíza {draws/r['games']:.3f}")
+
+if __name__ == "__main__":
+    main()
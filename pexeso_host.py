@@ -0,0 +1,171 @@
+import argparse
+import asyncio
+import math
+import os
+import random
+import time
+
+import pygame
+
+import pexeso
+
+# -----------------------
+# Hostiteľ viacerých relácií
+# -----------------------
+# Jeden proces obsluhuje viac hier (napr. viac obrazoviek jedného automatu).
+# Každá relácia (pexeso.Session) beží ako asyncio úloha a kreslí do vlastného
+# povrchu; fonty, písmená, pozadia, atlasy kariet a zvuky sú spoločné.
+# Hostiteľ povrchy poskladá do mriežky v jednom okne (len zmenené obdĺžniky),
+# smeruje vstup podľa polohy myši a priebežne vypisuje cenu snímky relácií.
+#   python pexeso_host.py --sessions 4 --tile 600x400
+#   python pexeso_host.py --sessions 32 --headless --attract 300 --seconds 20
+COMPOSE_FPS = 60
+REPORT_S    = 5
+
+def parse_size(text):
+    w, h = (int(v) for v in text.lower().split("x"))
+    return w, h
+
+class Host:
+    def __init__(self, count, tile, cols=None, seed=0, composited=True):
+        self.tile = tile
+        self.cols = cols or math.ceil(math.sqrt(count))
+        self.rows = math.ceil(count / self.cols)
+        self.sessions = [pexeso.Session(tile, seed=seed + i, composited=composited) for i in range(count)]
+        self.focus = None  # relácia, ktorá dostáva klávesy a koliesko
+        self.running = True
+
+    def size(self):
+        return self.cols * self.tile[0], self.rows * self.tile[1]
+
+    def origin(self, i):
+        return (i % self.cols) * self.tile[0], (i // self.cols) * self.tile[1]
+
+    def session_at(self, pos):
+        if not (0 <= pos[0] < self.size()[0] and 0 <= pos[1] < self.size()[1]):
+            return None
+        i = (pos[1] // self.tile[1]) * self.cols + pos[0] // self.tile[0]
+        return i if i < len(self.sessions) else None
+
+    def wants(self, i, event):
+        # rovnaké filtrovanie podľa stavu ako allow_events v jednej hre, aby
+        # napr. pohyb myši nebudil relácie mimo nastavení
+        s = self.sessions[i]
+        return event.type in pexeso.STATE_EVENTS.get(s.state, pexeso.BASE_EVENTS)
+
+    def route(self, event):
+        if event.type == pygame.QUIT:
+            self.running = False
+        elif pexeso.wheel_click(event):
+            return  # koliesko ide relácii s fokusom ako MOUSEWHEEL
+        elif hasattr(event, "pos"):
+            i = self.session_at(event.pos)
+            if i is None:
+                return
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                self.focus = i
+            if not self.wants(i, event):
+                return
+            ox, oy = self.origin(i)
+            attrs = dict(event.dict, pos=(event.pos[0] - ox, event.pos[1] - oy))
+            self.sessions[i].post(pygame.event.Event(event.type, attrs))
+        elif (event.type in (pygame.KEYDOWN, pygame.MOUSEWHEEL) and self.focus is not None
+                and self.wants(self.focus, event)):
+            self.sessions[self.focus].post(event)
+
+    def compose(self, window):
+        rects = []
+        for i, s in enumerate(self.sessions):
+            ox, oy = self.origin(i)
+            for r in s.renderer.take():
+                rects.append(window.blit(s.surface, (r.x + ox, r.y + oy), r))
+        if rects:
+            pygame.display.update(rects)
+
+    async def attract(self, session, rng, period_ms):
+        # ukážkový režim: náhodné kliky na skryté karty, po konci nová hra
+        while self.running and session.alive:
+            await asyncio.sleep(period_ms / 1000 * rng.uniform(0.5, 1.5))
+            if session.state != "game":
+                continue
+            if session.engine.game_over:
+                session.start(session.difficulty, session.game_mode)
+                continue
+            hidden = session.engine.board.hidden()
+            x, y = session.grid.cell(int(rng.choice(hidden)))
+            pos = (x + session.grid.size // 2, y + session.grid.size // 2)
+            session.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos))
+
+    def report(self):
+        lines = []
+        busy = 0.0
+        for i, s in enumerate(self.sessions):
+            p50, p95, n = s.cost()
+            busy += sum(s.costs)
+            lines.append(f"relácia {i:3d}  {s.state:<8s} snímok {n:5d}  p50 {p50:6.2f} ms  p95 {p95:6.2f} ms")
+        lines.append(f"spolu {busy*1000:.0f} ms práce v posledných oknách")
+        return "\n".join(lines)
+
+    async def run(self, window=None, seconds=None, attract=None, render=True, report_every=REPORT_S):
+        tasks = [asyncio.create_task(s.run(render)) for s in self.sessions]
+        if attract:
+            tasks += [asyncio.create_task(self.attract(s, random.Random(i), attract))
+                      for i, s in enumerate(self.sessions)]
+        start = last = time.perf_counter()
+        while self.running and any(s.alive for s in self.sessions):
+            for event in pygame.event.get():
+                self.route(event)
+            if window is not None:
+                self.compose(window)
+            await asyncio.sleep(1 / COMPOSE_FPS)
+            now = time.perf_counter()
+            if seconds and now - start >= seconds:
+                break
+            if report_every and now - last >= report_every:
+                print(self.report())
+                last = now
+        self.running = False
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        print(self.report())
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Viac hier Pexeso v jednom procese.")
+    ap.add_argument("--sessions", type=int, default=4)
+    ap.add_argument("--tile", type=parse_size, default=(600, 400), help="veľkosť jednej relácie, napr. 600x400")
+    ap.add_argument("--cols", type=int, help="počet relácií vedľa seba (predvolene štvorec)")
+    ap.add_argument("--headless", action="store_true", help="bez okna a zvuku (záťažové testy)")
+    ap.add_argument("--seconds", type=float, help="skonči po danom čase")
+    ap.add_argument("--attract", type=int, metavar="MS", help="ukážkový režim: náhodný klik každých ~MS ms")
+    ap.add_argument("--difficulty", help="relácie začnú rovno hrou (easy, medium, hard alebo RxC)")
+    ap.add_argument("--mode", choices=["single", "multi"], default="single")
+    ap.add_argument("--no-render", action="store_true", help="relácie nekreslia, len počítajú")
+    ap.add_argument("--report-every", type=float, default=REPORT_S)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    if args.difficulty and args.difficulty not in pexeso.boards:
+        try:
+            pexeso.add_board(args.difficulty)
+        except ValueError:
+            ap.error(f"neplatná obtiažnosť {args.difficulty!r}: easy, medium, hard alebo RxC "
+                     "s párnym počtom kariet")
+
+    if args.headless:  # SDL číta ovládače až pri pygame.init()
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.mixer.pre_init(pexeso.AUDIO_FREQ, -16, 2, pexeso.AUDIO_BUFFER)
+    pygame.init()
+    host = Host(args.sessions, args.tile, args.cols, args.seed, composited=not args.headless)
+    window = pygame.display.set_mode(host.size())
+    pygame.display.set_caption(f"Pexeso × {args.sessions}")
+    if not args.headless:
+        pexeso.start_audio()
+    if args.difficulty:
+        for s in host.sessions:
+            s.start(args.difficulty, args.mode)
+    asyncio.run(host.run(None if args.headless else window, args.seconds, args.attract,
+                         not args.no_render, args.report_every))
+
+if __name__ == "__main__":
+    main()
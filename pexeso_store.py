@@ -0,0 +1,229 @@
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+# -----------------------
+# Uložené nastavenia a štatistiky
+# -----------------------
+# SQLite databáza s nastaveniami a výsledkami dohraných hier. Zápisy sa len
+# zaradia do fronty; vlákno na pozadí ich po dávkach (najviac FLUSH_S sekúnd
+# čakania) zapíše v jednej transakcii, takže disk nikdy nezdrží snímku.
+# Súhrny (najlepší čas, priemery) sa počítajú triggerom pri vložení hry do
+# tabuľky stats, dotazy teda nečítajú celú históriu.
+#   python pexeso_store.py            # vypíše štatistiky
+DB_PATH = os.environ.get("PEXESO_DB") or os.path.join(
+    os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share"),
+    "pexeso", "pexeso.db")
+FLUSH_S = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS games (
+    id          INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    difficulty  TEXT NOT NULL,
+    mode        TEXT NOT NULL,
+    rows        INTEGER NOT NULL,
+    cols        INTEGER NOT NULL,
+    moves       INTEGER NOT NULL,
+    moves1      INTEGER NOT NULL,
+    moves2      INTEGER NOT NULL,
+    score1      INTEGER NOT NULL,
+    score2      INTEGER NOT NULL,
+    winner      INTEGER,
+    duration_ms INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_time ON games (difficulty, mode, duration_ms);
+CREATE TABLE IF NOT EXISTS stats (
+    difficulty  TEXT NOT NULL,
+    mode        TEXT NOT NULL,
+    games       INTEGER NOT NULL,
+    total_ms    INTEGER NOT NULL,
+    total_moves INTEGER NOT NULL,
+    best_ms     INTEGER NOT NULL,
+    best_moves  INTEGER NOT NULL,
+    PRIMARY KEY (difficulty, mode)
+);
+CREATE TRIGGER IF NOT EXISTS games_stats AFTER INSERT ON games BEGIN
+    INSERT INTO stats VALUES (NEW.difficulty, NEW.mode, 1, NEW.duration_ms, NEW.moves,
+                              NEW.duration_ms, NEW.moves)
+    ON CONFLICT (difficulty, mode) DO UPDATE SET
+        games       = games + 1,
+        total_ms    = total_ms + excluded.total_ms,
+        total_moves = total_moves + excluded.total_moves,
+        best_ms     = min(best_ms, excluded.best_ms),
+        best_moves  = min(best_moves, excluded.best_moves);
+END;
+"""
+
+GAME_COLUMNS = ("finished_at", "difficulty", "mode", "rows", "cols", "moves", "moves1", "moves2",
+                "score1", "score2", "winner", "duration_ms")
+INSERT_GAME = f"INSERT INTO games ({', '.join(GAME_COLUMNS)}) VALUES ({', '.join('?' * len(GAME_COLUMNS))})"
+
+def game_result(engine, difficulty):
+    # riadok pre record_game() z dohranej hry (pexeso_engine.Engine)
+    return {
+        "finished_at": time.time(), "difficulty": difficulty, "mode": engine.mode,
+        "rows": engine.rows, "cols": engine.cols, "moves": sum(engine.moves),
+        "moves1": engine.moves[0], "moves2": engine.moves[1],
+        "score1": engine.scores[0], "score2": engine.scores[1],
+        "winner": engine.winner(), "duration_ms": engine.elapsed_ms(),
+    }
+
+class Store:
+    # threaded=False (prehliadač bez vlákien): zápisy čakajú na flush()/close()
+    def __init__(self, path=DB_PATH, threaded=True, flush_s=FLUSH_S):
+        self.path = path
+        self.flush_s = flush_s
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.settings = None  # posledné neuložené nastavenia
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = self._connect()  # na čítanie (a zápis bez vlákna) z volajúceho vlákna
+        self.errors = 0  # zlyhané dávky (zápis pokračuje ďalšími)
+        self.writer = None
+        if threaded:
+            # spojenie zapisovača sa otvára tu, aby chyba databázy vyšla z konštruktora
+            db = self._connect(check_same_thread=False)
+            self.writer = threading.Thread(target=self._write_loop, args=(db,), name="pexeso-store", daemon=True)
+            self.writer.start()
+
+    def _connect(self, check_same_thread=True):
+        db = sqlite3.connect(self.path, check_same_thread=check_same_thread)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(SCHEMA)
+        return db
+
+    # --- zápis (neblokuje) ---
+    def save_settings(self, settings):
+        # viac zmien za sebou (ťahanie slidera) sa zlúči do jedného zápisu
+        with self.lock:
+            pending = self.settings is not None
+            self.settings = dict(settings)
+        if not pending:
+            self.queue.put(("settings", None))
+
+    def record_game(self, result):
+        self.queue.put(("game", tuple(result[c] for c in GAME_COLUMNS)))
+
+    def flush(self):
+        # počká, kým sa zapíše všetko zaradené pred týmto volaním
+        if self.writer is None:
+            self._write(self.db, self._drain())
+        else:
+            done = threading.Event()
+            self.queue.put(("flush", done))
+            done.wait()
+
+    def poll(self):
+        # bez vlákna: raz za snímku zapíše, čo sa nazbieralo (s vláknom nič nerobí)
+        if self.writer is None and not self.queue.empty():
+            self._write(self.db, self._drain())
+
+    def close(self):
+        if self.writer is not None:
+            self.queue.put(("stop", None))
+            self.writer.join()
+            self.writer = None
+        else:
+            self.flush()
+        self.db.close()
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _write_loop(self, db):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_s
+            while batch[-1][0] in ("game", "settings"):
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._write(db, batch)
+            for kind, done in batch:
+                if kind == "flush":
+                    done.set()
+            if batch[-1][0] == "stop":
+                db.close()
+                return
+
+    def _write(self, db, batch):
+        # chyba zápisu (plný disk, zamknutá databáza) zahodí len túto dávku;
+        # vlákno musí bežať ďalej, inak by flush() čakal navždy
+        try:
+            self._commit(db, batch)
+        except Exception as e:
+            self.errors += 1
+            print(f"pexeso_store: zápis zlyhal: {e}", file=sys.stderr)
+
+    def _commit(self, db, batch):
+        games = [row for kind, row in batch if kind == "game"]
+        with self.lock:
+            settings, self.settings = self.settings, None
+        if not games and settings is None:
+            return
+        with db:  # jedna transakcia na dávku
+            db.executemany(INSERT_GAME, games)
+            if settings is not None:
+                db.executemany("INSERT OR REPLACE INTO settings VALUES (?, ?)",
+                               [(k, json.dumps(v)) for k, v in settings.items()])
+
+    # --- čítanie ---
+    def load_settings(self):
+        return {k: json.loads(v) for k, v in self.db.execute("SELECT key, value FROM settings")}
+
+    def best_times(self, mode="single"):
+        # obtiažnosť -> (najlepší čas v ms, najmenej ťahov)
+        rows = self.db.execute("SELECT difficulty, best_ms, best_moves FROM stats WHERE mode = ?", (mode,))
+        return {d: (ms, moves) for d, ms, moves in rows}
+
+    def averages(self):
+        # [(obtiažnosť, režim, hier, priemerný čas v ms, priemer ťahov)]
+        return self.db.execute(
+            "SELECT difficulty, mode, games, total_ms * 1.0 / games, total_moves * 1.0 / games "
+            "FROM stats ORDER BY difficulty, mode").fetchall()
+
+    def fastest(self, difficulty, mode="single", limit=10):
+        # najrýchlejšie hry cez index games_by_time
+        return self.db.execute(
+            "SELECT duration_ms, moves, finished_at FROM games WHERE difficulty = ? AND mode = ? "
+            "ORDER BY duration_ms LIMIT ?", (difficulty, mode, limit)).fetchall()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Štatistiky odohraných hier Pexesa.")
+    ap.add_argument("--db", default=DB_PATH)
+    ap.add_argument("--fastest", metavar="OBTIAŽNOSŤ", help="vypíše najrýchlejšie hry danej obtiažnosti")
+    args = ap.parse_args(argv)
+
+    store = Store(args.db, threaded=False)
+    for mode in ("single", "multi"):
+        for difficulty, (ms, moves) in sorted(store.best_times(mode).items()):
+            print(f"najlepšie  {difficulty:<8s}{mode:<8s}{ms/1000:8.1f} s{moves:6d} ťahov")
+    for difficulty, mode, games, ms, moves in store.averages():
+        print(f"priemer    {difficulty:<8s}{mode:<8s}{ms/1000:8.1f} s{moves:8.1f} ťahov  ({games} hier)")
+    if args.fastest:
+        for ms, moves, at in store.fastest(args.fastest):
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(at))}  {ms/1000:8.1f} s{moves:6d} ťahov")
+    store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from pexeso_engine import Engine, VirtualClock, difficulties, make_settings, pair_label, play_game, run_batch
+
+# -----------------------
+# Pomocné
+# -----------------------
+def new_engine(mode="single", wait_ms=1000, difficulty="easy"):
+    clock = VirtualClock()
+    return Engine(difficulties[difficulty], mode=mode, clock=clock, rng=random.Random(1), wait_ms=wait_ms), clock
+
+def pairs(engine):
+    # hodnota -> dvojica indexov
+    by_value = {}
+    for i, v in enumerate(engine.board.values.tolist()):
+        by_value.setdefault(v, []).append(i)
+    return list(by_value.values())
+
+def mismatch(engine):
+    (a, _), (b, _) = pairs(engine)[:2]
+    return a, b
+
+# -----------------------
+# Plocha
+# -----------------------
+def test_pair_label():
+    assert [pair_label(i) for i in (0, 25, 26, 27, 701, 702)] == ["A", "Z", "AA", "AB", "ZZ", "AAA"]
+
+def test_make_settings():
+    s = make_settings(20, 20)
+    assert len(s["values"]) == 400 and len(set(s["values"])) == 200
+
+@pytest.mark.parametrize("rows, cols", [(3, 3), (0, 4), (4, -2)])
+def test_make_settings_rejects(rows, cols):
+    with pytest.raises(ValueError):
+        make_settings(rows, cols)
+
+# -----------------------
+# Ťahy
+# -----------------------
+def test_match():
+    engine, _ = new_engine()
+    a, b = pairs(engine)[0]
+    assert engine.flip(a) == ["flip"]
+    assert engine.flip(b) == ["flip", "match"]
+    assert engine.board.matched[[a, b]].all()
+    assert engine.scores == [1, 0] and engine.moves == [1, 0]
+    assert engine.flip(a) == []  # spárovaná karta sa už neotočí
+
+def test_mismatch_hides_after_wait_ms():
+    engine, clock = new_engine(wait_ms=500)
+    a, b = mismatch(engine)
+    engine.flip(a)
+    assert engine.flip(b) == ["flip", "mismatch"]
+    assert not engine.can_flip()
+    clock.advance(500)
+    assert engine.update() == []
+    clock.advance(1)
+    assert engine.update() == ["hide"]
+    assert not engine.board.revealed[[a, b]].any()
+    assert engine.can_flip() and engine.scores == [0, 0] and engine.moves == [1, 0]
+
+def test_multi_switches_player_on_mismatch_only():
+    engine, _ = new_engine(mode="multi")
+    a, b = mismatch(engine)
+    engine.flip(a)
+    engine.flip(b)
+    engine.resolve()
+    assert engine.current == 2 and engine.moves == [1, 0]
+    c, d = pairs(engine)[2]
+    engine.flip(c)
+    engine.flip(d)
+    assert engine.current == 2  # po páre hrá ten istý hráč
+    assert engine.scores == [0, 1] and engine.moves == [1, 1]
+
+def test_game_over_and_winner():
+    engine, clock = new_engine(mode="multi")
+    for a, b in pairs(engine):
+        clock.advance(250)
+        events = engine.flip(a) + engine.flip(b)
+    assert "game_over" in events and engine.game_over and not engine.can_flip()
+    assert engine.scores == [4, 0] and engine.winner() == 1
+    assert engine.elapsed_ms() == 1000
+    clock.advance(5000)
+    assert engine.elapsed_ms() == 1000  # čas sa po konci hry zastaví
+
+def test_winner_draw_and_single():
+    engine, _ = new_engine(mode="multi")
+    engine.scores = [2, 2]
+    assert engine.winner() == 0
+    single, _ = new_engine()
+    assert single.winner() is None
+
+def test_deterministic_shuffle():
+    a, _ = new_engine(difficulty="hard")
+    b, _ = new_engine(difficulty="hard")
+    assert a.board.values.tolist() == b.board.values.tolist()
+
+# -----------------------
+# Simulácia
+# -----------------------
+def test_perfect_bot_single():
+    r = play_game(difficulties["easy"], rng=random.Random(3))
+    pairs_count = len(difficulties["easy"]["values"]) // 2
+    assert r["scores"] == (pairs_count, 0) and r["winner"] is None
+    assert pairs_count <= r["moves"] <= 2 * pairs_count
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_independent_of_workers(workers):
+    args = dict(settings=difficulties["medium"], games=60, mode="multi", players=("perfect", "random"),
+                seed=7, chunk=16)
+    assert run_batch(workers=workers, **args) == run_batch(workers=1, **args)
@@ -0,0 +1,64 @@
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import pytest
+
+from pexeso import CardGrid, HitIndex
+
+def scan(grid, points):
+    # pôvodné hľadanie karty (každá karta x <= mx <= x+size, prvá vyhrá),
+    # naraz pre všetky body a karty
+    pitch = grid.size + grid.margin
+    i, j = np.divmod(np.arange(grid.rows*grid.cols), grid.cols)
+    x, y = grid.gx + j*pitch, grid.gy + i*pitch
+    mx, my = points[:, :1], points[:, 1:]
+    inside = (x <= mx) & (mx <= x + grid.size) & (y <= my) & (my <= y + grid.size)
+    return [int(k) if hit else None for k, hit in zip(inside.argmax(1), inside.any(1))]
+
+@pytest.mark.parametrize("rows, cols, size, margin, gx, gy", [
+    (4, 2, 120, 15, 465, 130),     # easy v 1200x800
+    (6, 4, 107, 13, 360, 40),
+    (30, 40, 43, 5, -700, -350),   # posunutá veľká plocha
+    (3, 5, 10, 1, 0, 0),
+])
+def test_card_at_matches_scan(rows, cols, size, margin, gx, gy):
+    grid = CardGrid(rows, cols, size, margin, gx, gy)
+    pitch = size + margin
+    rng = np.random.default_rng(7)
+    for _ in range(10):  # 100 000 bodov po dávkach
+        points = np.column_stack([rng.integers(gx - pitch, gx + (cols+1)*pitch, 10000),
+                                  rng.integers(gy - pitch, gy + (rows+1)*pitch, 10000)])
+        expected = scan(grid, points)
+        for pos, want in zip(points.tolist(), expected):
+            assert grid.card_at(pos) == want, pos
+
+def test_hit_topmost_wins():
+    index = HitIndex([
+        ("spodné", pygame.Rect(0, 0, 200, 100)),
+        ("stredné", pygame.Rect(50, 20, 200, 100)),
+        ("vrchné", pygame.Rect(100, 40, 30, 30)),
+    ])
+    assert index.hit((10, 10)) == "spodné"
+    assert index.hit((60, 30)) == "stredné"
+    assert index.hit((110, 50)) == "vrchné"
+    assert index.hit((240, 110)) == "stredné"  # cez hranicu bunky HitIndex.CELL
+    assert index.hit((300, 300)) is None
+    assert index.hit((200, 10)) is None         # pravý okraj Rect už nepatrí
+
+def test_hit_matches_scan():
+    rng = random.Random(3)
+    items = [(n, pygame.Rect(rng.randrange(800), rng.randrange(600), rng.randrange(1, 300), rng.randrange(1, 200)))
+             for n in range(40)]
+    index = HitIndex(items)
+    for _ in range(20000):
+        pos = (rng.randrange(-50, 1150), rng.randrange(-50, 850))
+        top = None
+        for n, r in items:  # neskoršie tlačidlo je navrchu
+            if r.collidepoint(pos):
+                top = n
+        assert index.hit(pos) == top
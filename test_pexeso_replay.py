@@ -0,0 +1,66 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import pexeso
+from pexeso_engine import WAIT_MS, VirtualClock
+
+# Záznam sa hrá bez okna (render=False) s virtuálnymi hodinami; prehranie
+# zo súboru musí skončiť v rovnakom stave hry.
+E = pygame.event.Event
+
+def press(game, bid):
+    kw = pexeso.menu_layout(game.state)[0][bid]
+    return E(pygame.MOUSEBUTTONDOWN, button=1, pos=pexeso.button_rect(**kw).center)
+
+def card(game, idx):
+    x, y = game.grid.cell(idx)
+    return E(pygame.MOUSEBUTTONDOWN, button=1, pos=(x + game.grid.size//2, y + game.grid.size//2))
+
+def test_replay_matches_live(tmp_path):
+    path = str(tmp_path / "hra.pxr")
+    pygame.font.init()
+    pexeso.resize((1200, 800))
+    clock = VirtualClock(1000)
+    game = pexeso.Game(seed=42, clock=clock)
+    game.recorder = pexeso.Recorder(path, game)
+
+    def step(*events, dt=16):
+        clock.advance(dt)
+        assert game.frame(list(events), render=False)
+
+    for bid in (("start", 0), ("player", 1), ("diff", 1), ("play", 0)):
+        step(press(game, bid))
+    assert game.state == "game" and game.engine.mode == "multi"
+
+    by_value = {}
+    for i, v in enumerate(game.engine.board.values.tolist()):
+        by_value.setdefault(v, []).append(i)
+    pairs = list(by_value.values())
+
+    # nesprávny pár sa skryje až časovačom (záznam REC_TICK)
+    step(card(game, pairs[0][0]))
+    step(card(game, pairs[1][0]))
+    assert game.engine.waiting
+    step(dt=WAIT_MS + 1)
+    assert not game.engine.waiting and game.engine.current == 2
+
+    # zmena veľkosti okna uprostred hry mení polohy kariet
+    step(E(pygame.VIDEORESIZE, size=(1000, 700), w=1000, h=700))
+    for a, b in pairs:
+        step(card(game, a), dt=120)
+        step(card(game, b), dt=240)
+    assert game.engine.game_over
+    clock.advance(16)
+    assert not game.frame([E(pygame.QUIT)], render=False)
+    game.recorder.close()
+
+    replayed = pexeso.replay(path, 0)
+    live, again = game.engine, replayed.engine
+    assert replayed.state == "game" and again.game_over
+    assert again.moves == live.moves and again.scores == live.scores
+    assert again.elapsed_ms() == live.elapsed_ms()
+    assert again.board.values.tolist() == live.board.values.tolist()
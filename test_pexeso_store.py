@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from pexeso_engine import Engine, VirtualClock, difficulties
+from pexeso_store import Store, game_result
+
+def result(difficulty="easy", mode="single", duration_ms=1000, moves=4):
+    return {"finished_at": 1.0, "difficulty": difficulty, "mode": mode, "rows": 4, "cols": 2,
+            "moves": moves, "moves1": moves, "moves2": 0, "score1": 4, "score2": 0,
+            "winner": None, "duration_ms": duration_ms}
+
+@pytest.fixture(params=[True, False], ids=["thread", "no-thread"])
+def store(request, tmp_path):
+    s = Store(str(tmp_path / "pexeso.db"), threaded=request.param, flush_s=0.01)
+    yield s
+    s.close()
+
+def test_settings_round_trip(tmp_path):
+    path = str(tmp_path / "pexeso.db")
+    s = Store(path)
+    for volume in (0.1, 0.2, 0.3):  # zlúči sa do jedného zápisu
+        s.save_settings({"background_color": [180, 180, 180], "sound": False, "volume": volume})
+    s.close()
+    s = Store(path, threaded=False)
+    assert s.load_settings() == {"background_color": [180, 180, 180], "sound": False, "volume": 0.3}
+    s.close()
+
+def test_stats_from_trigger(store):
+    for ms, moves in ((3000, 6), (1000, 8), (2000, 4)):
+        store.record_game(result(duration_ms=ms, moves=moves))
+    store.record_game(result("hard", "multi", 9000, 20))
+    store.flush()
+    assert store.best_times() == {"easy": (1000, 4)}
+    assert store.best_times("multi") == {"hard": (9000, 20)}
+    assert store.averages() == [("easy", "single", 3, 2000.0, 6.0), ("hard", "multi", 1, 9000.0, 20.0)]
+    assert [ms for ms, _, _ in store.fastest("easy", limit=2)] == [1000, 2000]
+
+def test_failed_batch_keeps_writer_alive(store):
+    store.record_game(result(moves=None))  # NOT NULL -> dávka zlyhá
+    store.flush()
+    assert store.errors == 1
+    store.record_game(result())
+    store.flush()
+    assert store.best_times() == {"easy": (1000, 4)}
+
+def test_game_result():
+    clock = VirtualClock()
+    engine = Engine(difficulties["easy"], mode="multi", clock=clock, rng=random.Random(1))
+    by_value = {}
+    for i, v in enumerate(engine.board.values.tolist()):
+        by_value.setdefault(v, []).append(i)
+    for a, b in by_value.values():
+        clock.advance(500)
+        engine.flip(a)
+        engine.flip(b)
+    r = game_result(engine, "easy")
+    assert (r["mode"], r["moves"], r["score1"], r["winner"], r["duration_ms"]) == ("multi", 4, 4, 1, 2000)